@@ -92,8 +92,14 @@ class CtxThreadPoolExecutor(ThreadPoolExecutor):
     ) -> Future[R]:
         """
         Submit target in context.
+
+        The context is copied here, in the submitting thread. Copying in the worker
+        would copy the worker's own context instead. Each task needs its own copy,
+        since a context can't be entered by two threads at the same time (copying is
+        cheap, contexts are immutable mappings).
         """
-        fn = functools.partial(run_in_context, fn)
+        ctx = contextvars.copy_context()
+        fn = functools.partial(ctx.run, run_in_context, fn)
         return super().submit(fn, *args, **kwargs)
 
 
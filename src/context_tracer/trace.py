@@ -26,8 +26,7 @@ from .trace_types import (
     get_current_span_safe,
     trace_span_context,
 )
-from .utils.func_utils import func2str, get_func_bound_args
-from .utils.merge_patch import merge_patch
+from .utils.func_utils import bind_func_args, func2str, get_func_signature
 from .utils.types import ContextManagerProtocol, DecoratorMeta
 
 logger = logging.getLogger(__name__)
@@ -92,27 +91,37 @@ class _TraceContextDecorator(metaclass=DecoratorMeta):
     def __call__(self, func: Callable[P, R]) -> Callable[P, R]:
         """Called when used as a decorator."""
         assert func is not None and callable(func)
+        # Resolve the function name and signature once at decoration time, not on
+        # every call
+        func_name = func2str(func)
+        func_signature = get_func_signature(func)
         # Add function name as trace name if no name is provided
         if NAME_KEY not in self.data:
-            self.data[NAME_KEY] = func2str(func)
+            self.data[NAME_KEY] = func_name
 
         @functools.wraps(func)
         def wrapped_func(*args: P.args, **kwargs: P.kwargs) -> R:
+            if get_current_span() is None:
+                # Not tracing, call the function as is
+                return func(*args, **kwargs)
             # Call function in trace context
             with self as span:  # Enter trace context
                 if span is not None:
                     # Log function info
                     function_info: dict = {
-                        FUNCTION_NAME_KEY: func2str(func),
-                        FUNCTION_KWARGS_KEY: get_func_bound_args(func, *args, **kwargs),
+                        FUNCTION_NAME_KEY: func_name,
+                        FUNCTION_KWARGS_KEY: bind_func_args(
+                            func_signature, *args, **kwargs
+                        ),
                     }
                     span.update_data(**{FUNCTION_DECORATOR_KEY: function_info})
                 # Call function and get result
                 result = func(*args, **kwargs)
                 if span is not None:
-                    # Log function result
-                    function_info[FUNCTION_RETURNED_KEY] = result
-                    span.update_data(**{FUNCTION_DECORATOR_KEY: function_info})
+                    # Log function result, data is merged so only send what's new
+                    span.update_data(
+                        **{FUNCTION_DECORATOR_KEY: {FUNCTION_RETURNED_KEY: result}}
+                    )
             return result
 
         return wrapped_func
@@ -121,21 +130,22 @@ class _TraceContextDecorator(metaclass=DecoratorMeta):
         """
         Create a new span with the current one as parent (iff a current span exists).
         """
-        metadata = {
-            TRACE_METADATA_KEY: {
-                START_TIME_KEY: get_local_timestamp().isoformat(sep=" ")
-            }
-        }
-        self.data = merge_patch(self.data, metadata)
         parent_span = get_current_span()
-        if parent_span is not None:
-            # Create a new span from the current span
-            child = parent_span.new_child(**self.data)  # New child span
-            self._trace_ctx_mngr = trace_span_context(child)
-            return self._trace_ctx_mngr.__enter__()  # Enter span
-        # If no span is found, no child can be created, and no tracing is performed.
-        # Run in `Tracing` context to capture traces.
-        return None
+        if parent_span is None:
+            # If no span is found, no child can be created, and no tracing is performed.
+            # Run in `Tracing` context to capture traces.
+            return None
+        # Build fresh data for each span, `self.data` is shared by every call of a
+        # decorated function and span data is updated in place (`merge_patch`).
+        data = self.data.copy()
+        data[TRACE_METADATA_KEY] = {
+            **data.get(TRACE_METADATA_KEY, {}),
+            START_TIME_KEY: get_local_timestamp().isoformat(sep=" "),
+        }
+        # Create a new span from the current span
+        child = parent_span.new_child(**data)  # New child span
+        self._trace_ctx_mngr = trace_span_context(child)
+        return self._trace_ctx_mngr.__enter__()  # Enter span
 
     def __exit__(
         self,
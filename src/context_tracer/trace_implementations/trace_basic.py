@@ -29,7 +29,8 @@ class TraceSpanInMemory(TraceSpan, TraceTree):
         data: Optional[dict] = None,
     ) -> None:
         # TODO: Name in data?
-        self._uid = str(id(self)).encode()
+        # 8 byte id, unique while the span is alive (no need for a random uid in memory)
+        self._uid = id(self).to_bytes(8, "big")
         self._name = name
         self._data = data or dict()
         self._parent = parent
@@ -3,7 +3,9 @@ import functools
 import json
 import logging
 import os
+import threading
 import time
+from collections.abc import Iterable
 from http import HTTPStatus
 from pathlib import Path
 from typing import Any, AsyncIterator, Final, Self, TypedDict
@@ -15,6 +17,7 @@ from pydantic import BaseModel
 
 from context_tracer.trace_implementations.trace_sqlite.span_db import (
     SpanDataBase,
+    SpanDbRow,
 )
 from context_tracer.utils.fast_api_utils import (
     FastAPIProcessRunner,
@@ -32,7 +35,10 @@ log = logging.getLogger(__name__)
 
 SPAN_ENDPOINT_PATH: Final[str] = "/api/span/{span_uid}"
 SPAN_CHILDREN_ENDPOINT_PATH: Final[str] = "/api/span/{span_uid}/children"
+SPAN_BATCH_ENDPOINT_PATH: Final[str] = "/api/spans/batch"
 ROOT_SPAN_IDS_ENDPOINT_PATH: Final[str] = "/api/tracing/root"
+# Number of buffered writes after which the client sends them to the server
+MAX_PENDING_WRITES: Final[int] = 256
 
 
 # Types ############################################################
@@ -112,14 +118,88 @@ class SpanPayload(SpanDataPayload):
         }
 
 
+class NewSpanPayload(SpanPayload):
+    """New span posted to the trace server as part of a batch."""
+
+    uid: str
+
+    @classmethod
+    def from_span_dict(cls: type[Self], span: SpanDict) -> Self:
+        return cls(
+            uid=cls.uid_to_str(span["uid"]),
+            name=span["name"],
+            data_json=json.dumps(span["data"], cls=CustomEncoder),
+            parent_uid=cls.maybe_uid_to_str(span["parent_uid"]),
+        )
+
+    def to_span_db_row(self) -> SpanDbRow:
+        return SpanDbRow(
+            uid=self.uid_to_bytes(self.uid),
+            name=self.name,
+            data_json=self.data_json,
+            parent_uid=self.parent_uid_bytes,
+        )
+
+
+class SpanUpdatePayload(SpanDataPayload):
+    """Data update of an existing span posted to the trace server as part of a batch."""
+
+    uid: str
+
+
+class SpanBatchPayload(BaseModel):
+    """
+    Batch of writes posted to the trace server.
+
+    New spans are written first, updates are applied afterwards in the order given.
+    """
+
+    new_spans: list[NewSpanPayload] = []
+    updates: list[SpanUpdatePayload] = []
+
+
 # Client ###########################################################
 class SpanClientAPI:
-    """Client API for Span server."""
+    """
+    Client API for Span server.
 
-    url: str
+    Writes made with `buffer_new_span` and `buffer_update_span` are kept in a buffer
+    and sent to the server in a single request by `flush`. The buffer is flushed
+    before each read, when it grows beyond `max_pending`, and before the client is
+    pickled (e.g. to be sent to another process).
+    """
 
-    def __init__(self, url: str) -> None:
+    url: str
+    max_pending: int
+    _pending_spans: list[NewSpanPayload]
+    _pending_updates: list[SpanUpdatePayload]
+    # Held while flushing, so batches arrive at the server in the order they're made
+    _pending_lock: threading.Lock
+    _pid: int
+
+    def __init__(self, url: str, max_pending: int = MAX_PENDING_WRITES) -> None:
         self.url = url
+        self.max_pending = max_pending
+        self._reset_pending()
+
+    def _reset_pending(self) -> None:
+        """Forget all buffered writes (without sending them)."""
+        self._pending_spans = []
+        self._pending_updates = []
+        self._pending_lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Send buffered writes so that the receiver sees them, the buffer isn't copied
+        self.flush()
+        state = self.__dict__.copy()
+        for key in ("_pending_spans", "_pending_updates", "_pending_lock", "_pid"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._reset_pending()
 
     def wait_for_ready(
         self,
@@ -138,6 +218,7 @@ class SpanClientAPI:
         return resp.status_code == HTTPStatus.OK
 
     def get_span(self, uid: bytes) -> SpanDict:
+        self.flush()
         span_uid = SpanPayload.uid_to_str(uid)
         resp = requests.get(f"{self.url}{SPAN_ENDPOINT_PATH.format(span_uid=span_uid)}")
         resp.raise_for_status()
@@ -169,6 +250,73 @@ class SpanClientAPI:
         )
         resp.raise_for_status()
 
+    def put_new_spans(self, spans: Iterable[SpanDict]) -> None:
+        """Create multiple new spans with a single request."""
+        self.post_span_batch(
+            SpanBatchPayload(
+                new_spans=[NewSpanPayload.from_span_dict(span) for span in spans]
+            )
+        )
+
+    def post_span_batch(self, batch: SpanBatchPayload) -> None:
+        """Send a batch of new spans and span updates with a single request."""
+        resp = requests.post(
+            f"{self.url}{SPAN_BATCH_ENDPOINT_PATH}",
+            json=batch.model_dump(),
+        )
+        resp.raise_for_status()
+
+    def buffer_new_span(
+        self,
+        uid: bytes,
+        name: str,
+        data: dict[str, Any],
+        parent_uid: bytes | None = None,
+    ) -> None:
+        """Buffer a new span, to be sent to the server on the next `flush`."""
+        span_payload = NewSpanPayload.from_span_dict(
+            {"uid": uid, "name": name, "data": data, "parent_uid": parent_uid}
+        )
+        with self._pending_lock:
+            self._check_pid()
+            self._pending_spans.append(span_payload)
+            nb_pending = len(self._pending_spans) + len(self._pending_updates)
+        if nb_pending >= self.max_pending:
+            self.flush()
+
+    def buffer_update_span(self, uid: bytes, data: dict[str, Any]) -> None:
+        """Buffer a data update of a span, to be sent to the server on the next `flush`."""
+        update_payload = SpanUpdatePayload(
+            uid=SpanPayload.uid_to_str(uid),
+            data_json=json.dumps(data, cls=CustomEncoder),
+        )
+        with self._pending_lock:
+            self._check_pid()
+            self._pending_updates.append(update_payload)
+            nb_pending = len(self._pending_spans) + len(self._pending_updates)
+        if nb_pending >= self.max_pending:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send all buffered writes to the server with a single request."""
+        with self._pending_lock:
+            self._check_pid()
+            if not self._pending_spans and not self._pending_updates:
+                return
+            batch = SpanBatchPayload(
+                new_spans=self._pending_spans, updates=self._pending_updates
+            )
+            self._pending_spans = []
+            self._pending_updates = []
+            self.post_span_batch(batch)
+
+    def _check_pid(self) -> None:
+        """Drop writes buffered by the parent process in a forked child process."""
+        if self._pid != os.getpid():
+            self._pending_spans = []
+            self._pending_updates = []
+            self._pid = os.getpid()
+
     def patch_update_span(self, uid: bytes, data: dict[str, Any]) -> None:
         span_uid = SpanPayload.uid_to_str(uid)
         request_payload = SpanDataPayload(data_json=json.dumps(data, cls=CustomEncoder))
@@ -179,6 +327,7 @@ class SpanClientAPI:
         resp.raise_for_status()
 
     def get_children_uids(self, uid: bytes) -> list[bytes]:
+        self.flush()
         span_uid = SpanPayload.uid_to_str(uid)
         resp = requests.get(
             f"{self.url}{SPAN_CHILDREN_ENDPOINT_PATH.format(span_uid=span_uid)}"
@@ -187,6 +336,7 @@ class SpanClientAPI:
         return [SpanPayload.uid_to_bytes(child_uid) for child_uid in resp.json()]
 
     def get_root_span_ids(self) -> list[bytes]:
+        self.flush()
         resp = requests.get(f"{self.url}{ROOT_SPAN_IDS_ENDPOINT_PATH}")
         resp.raise_for_status()
         return [SpanPayload.uid_to_bytes(uid) for uid in resp.json()]
@@ -206,7 +356,9 @@ class SpanServerAPI:
 
     async def get_span(self, span_uid: str) -> SpanPayload:
         span = self.span_db.get_span(uid=SpanPayload.uid_to_bytes(span_uid))
-        span_response = SpanPayload.from_bytes_ids(**span.model_dump())
+        span_response = SpanPayload.from_bytes_ids(
+            name=span.name, data_json=span.data_json, parent_uid=span.parent_uid
+        )
         return span_response
 
     async def put_new_span(self, span_uid: str, span: SpanPayload):
@@ -215,6 +367,16 @@ class SpanServerAPI:
         )
         return Response(status_code=HTTPStatus.OK)
 
+    async def post_span_batch(self, batch: SpanBatchPayload):
+        self.span_db.insert_or_update_many(
+            span.to_span_db_row() for span in batch.new_spans
+        )
+        self.span_db.update_data_json_many(
+            (SpanPayload.uid_to_bytes(update.uid), update.data_json)
+            for update in batch.updates
+        )
+        return Response(status_code=HTTPStatus.OK)
+
     async def patch_update_span(self, span_uid: str, span_data: SpanDataPayload):
         self.span_db.update_data_json(
             uid=SpanPayload.uid_to_bytes(span_uid), data_json=span_data.data_json
@@ -240,14 +402,18 @@ class SpanServerAPI:
         - https://asgi.readthedocs.io/en/latest/specs/lifespan.html
         """
         log.debug(f"{self.__class__.__name__}.lifespan enter")
-        yield
-        log.debug(f"{self.__class__.__name__}.lifespan exit")
+        try:
+            yield
+        finally:
+            log.debug(f"{self.__class__.__name__}.lifespan exit")
+            self.span_db.close()
 
     def get_router(
         self,
         span_api_path: str = SPAN_ENDPOINT_PATH,
         span_children_path: str = SPAN_CHILDREN_ENDPOINT_PATH,
         span_root_ids_path: str = ROOT_SPAN_IDS_ENDPOINT_PATH,
+        span_batch_path: str = SPAN_BATCH_ENDPOINT_PATH,
     ) -> APIRouter:
         """
         Returns a router with the span server HTTP API endpoints.
@@ -261,6 +427,7 @@ class SpanServerAPI:
             span_api_path, self.get_span, methods=["GET"], response_model=SpanPayload
         )
         router.add_api_route(span_children_path, self.get_children_ids, methods=["GET"])
+        router.add_api_route(span_batch_path, self.post_span_batch, methods=["POST"])
         router.add_api_route(
             span_root_ids_path, self.get_root_span_ids, methods=["GET"]
         )
@@ -277,6 +444,7 @@ class SpanServerAPI:
         readiness_path: str = READINESS_ENDPOINT_PATH,
         span_children_path: str = SPAN_CHILDREN_ENDPOINT_PATH,
         span_root_ids_path: str = ROOT_SPAN_IDS_ENDPOINT_PATH,
+        span_batch_path: str = SPAN_BATCH_ENDPOINT_PATH,
         log_path: Path | None = None,
         log_level: int = logging.INFO,
     ) -> FastAPI:
@@ -291,6 +459,7 @@ class SpanServerAPI:
             span_api_path=span_api_path,
             span_children_path=span_children_path,
             span_root_ids_path=span_root_ids_path,
+            span_batch_path=span_batch_path,
         )
         app = FastAPI(lifespan=api.lifespan)
         app.add_api_route(readiness_path, readiness_api, methods=["GET"])
@@ -63,12 +63,15 @@ class TraceSpanRemote(TraceSpan, AbstractContextManager):
         parent_uid: bytes | None,
     ) -> Self:
         span_uid = new_uid()
-        client.put_new_span(
+        client.buffer_new_span(
             uid=span_uid,
             name=name,
             data=data,
             parent_uid=parent_uid,
         )
+        # Send the new span right away, so the (live) viewer sees running spans.
+        # Only data updates stay buffered (until the next new span or exit).
+        client.flush()
         return cls(client=client, span_uid=span_uid)
 
     def new_child(self: Self, **data) -> Self:
@@ -78,11 +81,16 @@ class TraceSpanRemote(TraceSpan, AbstractContextManager):
         )
 
     def update_data(self, **new_data) -> None:
-        self.client.patch_update_span(
+        self.client.buffer_update_span(
             uid=self._span_uid,
             data=new_data,
         )
 
+    def __exit__(self, *exc) -> None:
+        # Send the writes buffered while the span was running
+        self.client.flush()
+        return None
+
 
 class TracingRemote(Tracing[TraceSpanRemote, TraceTreeSqlite]):
     span_db: SpanDataBase
@@ -110,6 +118,8 @@ class TracingRemote(Tracing[TraceSpanRemote, TraceTreeSqlite]):
 
     @property
     def span_db_path(self) -> Path:
+        # The server process needs a database file to connect to
+        assert self.span_db.db_path is not None, "Remote tracing requires a file db!"
         return self.span_db.db_path
 
     @property
@@ -122,21 +132,22 @@ class TracingRemote(Tracing[TraceSpanRemote, TraceTreeSqlite]):
     @property
     def tree(self) -> TraceTreeSqlite:
         assert self._root_uid is not None, "No Root UID found, Tracing not started!"
+        if self._api_client is not None:
+            # The tree reads the database directly, make sure all writes are sent
+            self._api_client.flush()
         return TraceTreeSqlite(span_db=self.span_db, span_uid=self._root_uid)
 
     def __enter__(self: Self) -> Self:
         """Start a new tracing."""
         self._server: FastAPIProcessRunner = create_span_server(
-            db_path=self.span_db.db_path,
+            db_path=self.span_db_path,
             log_path=self._log_path,
             **self._server_kwargs,
         )
         self._server.__enter__()
+        # Wait on the server's startup event instead of polling the readiness endpoint
+        self._server.wait_for_ready()
         self._api_client = SpanClientAPI(url=self._server.url)
-        self._api_client.wait_for_ready()
-        assert (
-            self._api_client.is_ready()
-        ), f"Server at {self._api_client.url!r} is not ready."
         if self._root_uid is None:
             self._root_uid = TraceSpanRemote.new(
                 client=self._api_client,
@@ -152,9 +163,16 @@ class TracingRemote(Tracing[TraceSpanRemote, TraceTreeSqlite]):
             # Close tracing first, so that the server can be stopped
             super().__exit__(*args, **kwargs)
         finally:
-            if self._server is not None:
-                self._server.__exit__(*args, **kwargs)
-            self._server = None
-            # Persist the write-ahead-log to the database
-            self.span_db.wal_checkpoint()
+            try:
+                if self._server is not None and self._api_client is not None:
+                    # Send remaining buffered writes before the server is stopped
+                    self._api_client.flush()
+            finally:
+                if self._server is not None:
+                    self._server.__exit__(*args, **kwargs)
+                self._server = None
+                # Persist the write-ahead-log to the database
+                self.span_db.wal_checkpoint()
+                # Release the connections, they are reopened if the trace is read later
+                self.span_db.close()
         return
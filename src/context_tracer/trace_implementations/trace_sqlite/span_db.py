@@ -1,19 +1,25 @@
 import contextlib
-import json
+import dataclasses
+import itertools
 import logging
+import operator
+import os
 import sqlite3
-from collections.abc import Iterator
+import threading
+import time
+import uuid
+import weakref
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
-from typing import Final
+from typing import Any, Final
 
-from pydantic import BaseModel
-
-from context_tracer.utils.json_encoder import JSONDictType
+from context_tracer.utils.json_encoder import JSONDictType, loads
 
 log = logging.getLogger(__name__)
 
 
-class SpanDbRow(BaseModel):
+@dataclasses.dataclass(slots=True, frozen=True)
+class SpanDbRow:
     """Representation of a row in the database table."""
 
     uid: bytes
@@ -23,7 +29,11 @@ class SpanDbRow(BaseModel):
 
     @property
     def data(self) -> JSONDictType:
-        return json.loads(self.data_json)
+        return loads(self.data_json)
+
+    def as_tuple(self) -> tuple[bytes, str, str, bytes | None]:
+        """Fields in the positional order of `SpanDataBase.insert`."""
+        return (self.uid, self.name, self.data_json, self.parent_uid)
 
     def __hash__(self) -> int:
         return self.uid.__hash__()
@@ -36,76 +46,332 @@ PARENT_UID_KEY: Final[str] = "parent_uid"
 NAME_KEY: Final[str] = "name"
 DATA_KEY: Final[str] = "data_json"
 UPDATED_TIME_KEY: Final[str] = "timestamp_last_updated"
+# Number of buffered writes after which they are written to the database
+MAX_PENDING_WRITES: Final[int] = 256
+
+# Statements are formatted once at import, each connection's statement cache
+# (keyed on the SQL text) keeps them prepared between calls.
+# UID is primary key
+# The last update timestamp is set by the insert and update queries
+CREATE_TABLE_SQL: Final[str] = f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+        {UID_KEY} BLOB PRIMARY KEY,
+        {PARENT_UID_KEY} BLOB,
+        {NAME_KEY} TEXT NOT NULL,
+        {DATA_KEY} TEXT NOT NULL,
+        {UPDATED_TIME_KEY} FLOAT
+    ) WITHOUT ROWID;
+"""
+# Indexes for lookups by name, children by parent, and root spans
+# (partial indexes so roots don't bloat the parent index and vice versa)
+CREATE_INDEXES_SQL: Final[list[str]] = [
+    f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_{NAME_KEY} ON {TABLE_NAME}({NAME_KEY});",
+    f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_{PARENT_UID_KEY} ON {TABLE_NAME}({PARENT_UID_KEY}) WHERE {PARENT_UID_KEY} IS NOT NULL;",
+    f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_root ON {TABLE_NAME}({UID_KEY}) WHERE {PARENT_UID_KEY} IS NULL;",
+]
+# Timestamps used to be set by triggers, drop these from existing databases
+DROP_TIMESTAMP_TRIGGERS_SQL: Final[list[str]] = [
+    f"DROP TRIGGER IF EXISTS on_insert_update_{UPDATED_TIME_KEY};",
+    f"DROP TRIGGER IF EXISTS on_update_update_{UPDATED_TIME_KEY};",
+]
+INSERT_ROW_SQL: Final[str] = f"""
+    INSERT INTO {TABLE_NAME} (
+        {UID_KEY}, {PARENT_UID_KEY}, {NAME_KEY}, {DATA_KEY}, {UPDATED_TIME_KEY}
+    )  VALUES (?, ?, ?, ?, ?);
+"""
+UPDATE_ROW_SQL: Final[str] = f"""
+    INSERT INTO {TABLE_NAME} (
+        {UID_KEY}, {PARENT_UID_KEY}, {NAME_KEY}, {DATA_KEY}, {UPDATED_TIME_KEY}
+    )  VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT ({UID_KEY}) DO UPDATE SET
+        {NAME_KEY} = excluded.{NAME_KEY},
+        {DATA_KEY} = excluded.{DATA_KEY},
+        {UPDATED_TIME_KEY} = excluded.{UPDATED_TIME_KEY};
+"""
+GET_SPAN_SQL: Final[str] = f"""
+    SELECT {UID_KEY}, {PARENT_UID_KEY}, {NAME_KEY}, {DATA_KEY}
+    FROM {TABLE_NAME} WHERE {UID_KEY} = ?;
+"""
+GET_ROOT_ID_SQL: Final[str] = (
+    f"SELECT {UID_KEY} FROM {TABLE_NAME} WHERE {PARENT_UID_KEY} IS NULL;"
+)
+GET_ROOT_COUNT_SQL: Final[str] = (
+    f"SELECT COUNT(*) FROM {TABLE_NAME} WHERE {PARENT_UID_KEY} IS NULL;"
+)
+GET_CHILDREN_IDS_SQL: Final[str] = (
+    f"SELECT {UID_KEY} FROM {TABLE_NAME} WHERE {PARENT_UID_KEY} = ?;"
+)
+GET_LEAF_UIDS_SQL: Final[str] = f"""
+    WITH RECURSIVE subtree({UID_KEY}) AS (
+        VALUES(?)
+        UNION ALL
+        SELECT span.{UID_KEY} FROM {TABLE_NAME} AS span
+        JOIN subtree ON span.{PARENT_UID_KEY} = subtree.{UID_KEY}
+    )
+    SELECT subtree.{UID_KEY} FROM subtree
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {TABLE_NAME} AS child
+        WHERE child.{PARENT_UID_KEY} = subtree.{UID_KEY}
+    );
+"""
+GET_SPAN_NAME_EXISTS_SQL: Final[str] = f"""
+    WITH RECURSIVE subtree({UID_KEY}, {NAME_KEY}) AS (
+        SELECT {UID_KEY}, {NAME_KEY} FROM {TABLE_NAME} WHERE {UID_KEY} = ?
+        UNION ALL
+        SELECT span.{UID_KEY}, span.{NAME_KEY} FROM {TABLE_NAME} AS span
+        JOIN subtree ON span.{PARENT_UID_KEY} = subtree.{UID_KEY}
+    )
+    SELECT 1 FROM subtree WHERE {NAME_KEY} = ? LIMIT 1;
+"""
+UPDATE_DATA_JSON_SQL: Final[str] = f"""
+    UPDATE {TABLE_NAME}
+    SET
+        {DATA_KEY} = json_patch({DATA_KEY}, ?),
+        {UPDATED_TIME_KEY} = ?
+    WHERE {UID_KEY} = ?;
+"""
+GET_DATA_SQL: Final[str] = f"SELECT {DATA_KEY} FROM {TABLE_NAME} WHERE {UID_KEY} = ?;"
+GET_NAME_SQL: Final[str] = f"SELECT {NAME_KEY} FROM {TABLE_NAME} WHERE {UID_KEY} = ?;"
+GET_PARENT_UID_SQL: Final[str] = (
+    f"SELECT {PARENT_UID_KEY} FROM {TABLE_NAME} WHERE {UID_KEY} = ?;"
+)
+GET_SPAN_UIDS_FROM_NAME_SQL: Final[str] = (
+    f"SELECT {UID_KEY} FROM {TABLE_NAME} WHERE {NAME_KEY} = ?;"
+)
+GET_LAST_SPAN_UID_SQL: Final[str] = (
+    f"SELECT {UID_KEY} FROM {TABLE_NAME} ORDER BY {UID_KEY} DESC LIMIT 1;"
+)
+GET_LAST_UPDATED_SPAN_UID_SQL: Final[str] = (
+    f"SELECT {UID_KEY}, {UPDATED_TIME_KEY} FROM {TABLE_NAME} ORDER BY {UPDATED_TIME_KEY} DESC LIMIT 1;"
+)
 
 
 class SpanDataBase:
     """
     Database for storing spans.
-    """
 
-    db_path: Path
+    If no `db_path` is given, the database is kept in memory for the lifetime of this
+    object (e.g. for testing). In-memory databases can't be pickled.
+
+    Writes made with `buffer_insert` and `buffer_update_data_json` are kept in a buffer
+    and written in a single transaction by `flush`. The buffer is flushed before each
+    read or direct write, when it grows beyond `max_pending_writes`, and before the
+    database object is pickled (e.g. to be sent to another process).
+    """
 
-    def __init__(self, db_path: Path) -> None:
-        self.db_path = db_path.expanduser().resolve()
+    db_path: Path | None
+    _database: str  # Database argument passed to `sqlite3.connect`
+    _is_uri: bool
+    # Connection keeping a shared in-memory database alive between connections
+    _keep_alive_conn: sqlite3.Connection | None = None
+    # Connections are cached per thread, and reset in a forked child process.
+    # Keyed weakly by thread, so connections of finished threads aren't kept open.
+    _local: threading.local
+    _connections: weakref.WeakKeyDictionary[threading.Thread, sqlite3.Connection]
+    _connections_lock: threading.Lock
+    _pid: int
+    # Clock used to timestamp inserts and updates (can be replaced in tests)
+    _now: Callable[[], float]
+    max_pending_writes: int
+    # Buffered `(sql, parameters)` writes, in the order they were made
+    _pending_writes: list[tuple[str, tuple[Any, ...]]]
+    # Held while flushing, so buffered writes are committed in order
+    _pending_lock: threading.Lock
+
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        max_pending_writes: int = MAX_PENDING_WRITES,
+    ) -> None:
+        self._now = time.time
+        self.max_pending_writes = max_pending_writes
+        self._reset_pending_writes()
+        if db_path is None:
+            self.db_path = None
+            # Named shared-cache in-memory database, so each connection sees the same data
+            self._database = f"file:span_db_{uuid.uuid4().hex}?mode=memory&cache=shared"
+            self._is_uri = True
+            self._keep_alive_conn = sqlite3.connect(self._database, uri=True)
+            # The in-memory database only lives as long as this object
+            weakref.finalize(self, self._keep_alive_conn.close)
+        else:
+            self.db_path = db_path.expanduser().resolve()
+            self._database = str(self.db_path)
+            self._is_uri = False
+        self._reset_connections()
         self.init_db()
 
+    def _reset_connections(self) -> None:
+        """Forget all cached connections (without closing them)."""
+        self._local = threading.local()
+        self._connections = weakref.WeakKeyDictionary()
+        self._connections_lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _reset_pending_writes(self) -> None:
+        """Forget all buffered writes (without writing them)."""
+        self._pending_writes = []
+        self._pending_lock = threading.Lock()
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():
+            # Connections and buffered writes belong to the parent of a forked process
+            self._reset_connections()
+            self._reset_pending_writes()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Return the connection cached for the current thread, create it if needed."""
+        self._check_pid()
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            # Close finished threads' connections first, so SQLite can reuse their files
+            with self._connections_lock:
+                self._close_finished_thread_connections()
+            conn = sqlite3.connect(
+                self._database,
+                uri=self._is_uri,
+                isolation_level=None,
+                # Allow `close` to close connections created by other threads
+                check_same_thread=False,
+            )
+            self._configure_connection(conn)
+            self._local.conn = conn
+            thread = threading.current_thread()
+            with self._connections_lock:
+                self._connections[thread] = conn
+            # Connections are part of a reference cycle (statement cache), close them
+            # explicitly once the thread is gone instead of waiting for the GC
+            weakref.finalize(thread, conn.close)
+        return conn
+
+    def _close_finished_thread_connections(self) -> None:
+        """Close connections of finished threads, call with `_connections_lock` held."""
+        for thread, conn in list(self._connections.items()):
+            if not thread.is_alive():
+                del self._connections[thread]
+                conn.close()
+
+    def close(self) -> None:
+        """
+        Write buffered writes and close the cached connections to the database.
+
+        The database can still be used afterwards, connections are reopened when needed.
+        An in-memory database is kept until this object is garbage collected.
+        """
+        self.flush()
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def __getstate__(self) -> dict[str, Any]:
+        if self.db_path is None:
+            # A copy can't keep the in-memory database alive (or reach it from
+            # another process), don't hand out a copy that silently breaks
+            raise TypeError(
+                f"Can't pickle in-memory {self.__class__.__name__}, use a `db_path`."
+            )
+        # Write buffered writes so that the receiver sees them, the buffer isn't copied
+        self.flush()
+        # Connections can't be pickled, they are recreated when needed
+        state = self.__dict__.copy()
+        for key in (
+            "_keep_alive_conn",
+            "_local",
+            "_connections",
+            "_connections_lock",
+            "_pid",
+            "_pending_writes",
+            "_pending_lock",
+        ):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._reset_connections()
+        self._reset_pending_writes()
+
     @contextlib.contextmanager
     def connect_db(self) -> Iterator[sqlite3.Connection]:
         try:
-            with sqlite3.connect(str(self.db_path), isolation_level=None) as conn:
-                yield conn
+            yield self._get_connection()
         except sqlite3.Error as exc:
-            log.exception(f"Error connecting to database {self.db_path!r}: {exc}")
+            log.exception(f"Error connecting to database {self._database!r}: {exc}")
+
+    @staticmethod
+    def _configure_connection(conn: sqlite3.Connection) -> None:
+        """
+        Set per-connection pragmas.
+
+        - `synchronous=NORMAL` is safe in WAL mode and avoids an fsync on every commit.
+        - `busy_timeout` waits on locks held by other connections instead of failing.
+        More info: https://www.sqlite.org/pragma.html
+        """
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA busy_timeout=5000;")
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        conn.execute("PRAGMA cache_size=-64000;")  # 64MB
 
     @contextlib.contextmanager
     def cursor(self) -> Iterator[sqlite3.Cursor]:
+        """Cursor that sees all writes made so far (buffered writes are flushed)."""
+        self.flush()
+        with self._cursor() as cursor:
+            yield cursor
+
+    @contextlib.contextmanager
+    def _cursor(self) -> Iterator[sqlite3.Cursor]:
         with self.connect_db() as db_conn:
             with contextlib.closing(db_conn.cursor()) as cursor:
                 yield cursor
 
-    def init_db(self) -> None:
-        """Initialize the database."""
-        # Initialize the database
-        # UID is primary key
-        # Create a trigger to timestamp the last update
-        CREATE_TABLE_SQL = f"""
-            CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-                {UID_KEY} BLOB PRIMARY KEY,
-                {PARENT_UID_KEY} BLOB,
-                {NAME_KEY} TEXT NOT NULL,
-                {DATA_KEY} TEXT NOT NULL,
-                {UPDATED_TIME_KEY} FLOAT
-            ) WITHOUT ROWID;
-        """
-        CREATE_TIMESTAMP_INSERT_TRIGGER_SQL = f"""
-        CREATE TRIGGER IF NOT EXISTS on_insert_update_{UPDATED_TIME_KEY}
-            AFTER INSERT ON {TABLE_NAME}
-        BEGIN
-            UPDATE {TABLE_NAME}
-            SET {UPDATED_TIME_KEY} = unixepoch('now','subsec')
-            WHERE {UID_KEY} = NEW.{UID_KEY};
-        END;
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
         """
-        CREATE_TIMESTAMP_UPDATE_TRIGGER_SQL = f"""
-        CREATE TRIGGER IF NOT EXISTS on_update_update_{UPDATED_TIME_KEY}
-            AFTER UPDATE OF {DATA_KEY}, {NAME_KEY}, {PARENT_UID_KEY} ON {TABLE_NAME}
-        BEGIN
-            UPDATE {TABLE_NAME}
-            SET {UPDATED_TIME_KEY} = unixepoch('now','subsec')
-            WHERE {UID_KEY} = NEW.{UID_KEY};
-        END;
+        Run all statements executed on the cursor in a single transaction.
+
+        Commits on success and rolls back if an exception is raised.
+        Uses `BEGIN IMMEDIATE` to take the write lock at the start of the transaction.
         """
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush()
+        with self._transaction() as cursor:
+            yield cursor
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        with self._cursor() as cursor:
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+            cursor.execute("COMMIT;")
+
+    def init_db(self) -> None:
+        """Initialize the database."""
+        if self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
         with self.cursor() as cursor:
             # Set Write-Ahead Logging (WAL) mode to enable concurrent reads and writes
             # https://www.sqlite.org/wal.html
             cursor.execute("PRAGMA journal_mode=WAL;")
             cursor.execute(CREATE_TABLE_SQL)
-            cursor.execute(CREATE_TIMESTAMP_INSERT_TRIGGER_SQL)
-            cursor.execute(CREATE_TIMESTAMP_UPDATE_TRIGGER_SQL)
+            for drop_trigger_sql in DROP_TIMESTAMP_TRIGGERS_SQL:
+                cursor.execute(drop_trigger_sql)
+            for create_index_sql in CREATE_INDEXES_SQL:
+                cursor.execute(create_index_sql)
             cursor.connection.commit()
-        assert self.db_path.exists()
-        log.info(f"Database initialized at {self.db_path!r}.")
+        assert self.db_path is None or self.db_path.exists()
+        log.info(f"Database initialized at {self._database!r}.")
+
+    def reset(self) -> None:
+        """Delete all spans, keeping the schema."""
+        with self.transaction() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE_NAME};")
 
     def wal_checkpoint(self) -> None:
         """
@@ -115,6 +381,46 @@ class SpanDataBase:
             cursor.execute("PRAGMA wal_checkpoint(FULL);")
             cursor.connection.commit()
 
+    def flush(self) -> None:
+        """Write all buffered writes in a single transaction."""
+        self._check_pid()
+        if not self._pending_writes:
+            return
+        with self._pending_lock:
+            pending_writes, self._pending_writes = self._pending_writes, []
+            if not pending_writes:
+                return
+            with self._transaction() as cursor:
+                # Consecutive writes of the same statement are executed together
+                for sql, writes in itertools.groupby(
+                    pending_writes, key=operator.itemgetter(0)
+                ):
+                    cursor.executemany(sql, (parameters for _, parameters in writes))
+
+    def _buffer_write(self, sql: str, parameters: tuple[Any, ...]) -> None:
+        self._check_pid()
+        with self._pending_lock:
+            self._pending_writes.append((sql, parameters))
+            nb_pending = len(self._pending_writes)
+        if nb_pending >= self.max_pending_writes:
+            self.flush()
+
+    def buffer_insert(
+        self,
+        uid: bytes,
+        name: str,
+        data_json: str,
+        parent_uid: bytes | None,
+    ) -> None:
+        """Same as `insert`, but buffered until the next `flush`."""
+        self._buffer_write(
+            INSERT_ROW_SQL, (uid, parent_uid, name, data_json, self._now())
+        )
+
+    def buffer_update_data_json(self, uid: bytes, data_json: str) -> None:
+        """Same as `update_data_json`, but buffered until the next `flush`."""
+        self._buffer_write(UPDATE_DATA_JSON_SQL, (data_json, self._now(), uid))
+
     def insert(
         self,
         uid: bytes,
@@ -123,15 +429,10 @@ class SpanDataBase:
         parent_uid: bytes | None,
     ) -> None:
         """Create a new row in the database table and return its id."""
-        INSERT_ROW_SQL = f"""
-            INSERT INTO {TABLE_NAME} (
-                {UID_KEY}, {PARENT_UID_KEY}, {NAME_KEY}, {DATA_KEY}
-            )  VALUES (?, ?, ?, ?);
-        """
         with self.cursor() as cursor:
             cursor.execute(
                 INSERT_ROW_SQL,
-                (uid, parent_uid, name, data_json),
+                (uid, parent_uid, name, data_json, self._now()),
             )
             cursor.connection.commit()
 
@@ -147,27 +448,30 @@ class SpanDataBase:
 
         Uses UPSERT: https://www.sqlite.org/draft/lang_UPSERT.html
         """
-        UPDATE_ROW_SQL = f"""
-            INSERT INTO {TABLE_NAME} (
-                {UID_KEY}, {PARENT_UID_KEY}, {NAME_KEY}, {DATA_KEY}
-            )  VALUES (?, ?, ?, ?)
-            ON CONFLICT ({UID_KEY}) DO UPDATE SET
-                {NAME_KEY} = excluded.{NAME_KEY},
-                {DATA_KEY} = excluded.{DATA_KEY};
-        """
         with self.cursor() as cursor:
             cursor.execute(
                 UPDATE_ROW_SQL,
-                (uid, parent_uid, name, data_json),
+                (uid, parent_uid, name, data_json, self._now()),
             )
             cursor.connection.commit()
 
+    def insert_or_update_many(self, spans: Iterable[SpanDbRow]) -> None:
+        """
+        Insert or update multiple rows in a single transaction.
+
+        Same semantics as `insert_or_update`, but all rows are written with one commit.
+        """
+        with self.transaction() as cursor:
+            cursor.executemany(
+                UPDATE_ROW_SQL,
+                (
+                    (span.uid, span.parent_uid, span.name, span.data_json, self._now())
+                    for span in spans
+                ),
+            )
+
     def get_span(self, uid: bytes) -> SpanDbRow:
         """Get the span corresponding to the given id."""
-        GET_SPAN_SQL = f"""
-            SELECT {UID_KEY}, {PARENT_UID_KEY}, {NAME_KEY}, {DATA_KEY}
-            FROM {TABLE_NAME} WHERE {UID_KEY} = ?;
-        """
         with self.cursor() as cursor:
             cursor.execute(GET_SPAN_SQL, (uid,))
             row = cursor.fetchone()
@@ -182,24 +486,39 @@ class SpanDataBase:
 
     def get_root_uids(self) -> list[bytes]:
         """Get the uid of the root row in the database table."""
-        GET_ROOT_ID_SQL = (
-            f"SELECT {UID_KEY} FROM {TABLE_NAME} WHERE {PARENT_UID_KEY} IS NULL;"
-        )
         with self.cursor() as cursor:
             cursor.execute(GET_ROOT_ID_SQL)
             root_uids = list(cursor.fetchall())
         return [row[0] for row in root_uids]
 
+    def get_root_span_count(self) -> int:
+        """Get the number of root rows (rows without parent) in the database table."""
+        with self.cursor() as cursor:
+            cursor.execute(GET_ROOT_COUNT_SQL)
+            (count,) = cursor.fetchone()
+        return count
+
     def get_children_uids(self, uid: bytes) -> list[bytes]:
         """Get the children_ids of a row in the database table."""
-        GET_CHILDREN_IDS_SQL = (
-            f"SELECT {UID_KEY} FROM {TABLE_NAME} WHERE {PARENT_UID_KEY} = ?;"
-        )
         with self.cursor() as cursor:
             cursor.execute(GET_CHILDREN_IDS_SQL, (uid,))
             child_rows = cursor.fetchall()
         return [row[0] for row in child_rows]
 
+    def get_leaf_uids(self, root_uid: bytes) -> list[bytes]:
+        """Get the uids of all leaf spans (spans without children) under the root span."""
+        with self.cursor() as cursor:
+            cursor.execute(GET_LEAF_UIDS_SQL, (root_uid,))
+            rows = cursor.fetchall()
+        return [row[0] for row in rows]
+
+    def get_span_name_exists(self, root_uid: bytes, name: str) -> bool:
+        """Check if a span with the given name exists in the tree under the root span."""
+        with self.cursor() as cursor:
+            cursor.execute(GET_SPAN_NAME_EXISTS_SQL, (root_uid, name))
+            row = cursor.fetchone()
+        return row is not None
+
     def update_data_json(self, uid: bytes, data_json: str) -> None:
         """
         Update the data of a row in the database table.
@@ -209,18 +528,24 @@ class SpanDataBase:
         - https://www.sqlite.org/json1.html#jpatch
         - https://datatracker.ietf.org/doc/html/rfc7396
         """
-        UPDATE_DATA_JSON_SQL = f"""
-            UPDATE {TABLE_NAME}
-            SET {DATA_KEY} = json_patch({DATA_KEY}, ?)
-            WHERE {UID_KEY} = ?;
-        """
         with self.cursor() as cursor:
-            cursor.execute(UPDATE_DATA_JSON_SQL, (data_json, uid))
+            cursor.execute(UPDATE_DATA_JSON_SQL, (data_json, self._now(), uid))
             cursor.connection.commit()
 
+    def update_data_json_many(self, updates: Iterable[tuple[bytes, str]]) -> None:
+        """
+        Apply multiple `(uid, data_json)` updates in a single transaction.
+
+        Same semantics as `update_data_json`, updates are applied in the order given.
+        """
+        with self.transaction() as cursor:
+            cursor.executemany(
+                UPDATE_DATA_JSON_SQL,
+                ((data_json, self._now(), uid) for uid, data_json in updates),
+            )
+
     def get_data_json(self, uid: bytes) -> str:
         """Get the data of a row in the database table."""
-        GET_DATA_SQL = f"SELECT {DATA_KEY} FROM {TABLE_NAME} WHERE {UID_KEY} = ?;"
         with self.cursor() as cursor:
             cursor.execute(GET_DATA_SQL, (uid,))
             data_json = cursor.fetchone()[0]
@@ -229,7 +554,6 @@ class SpanDataBase:
 
     def get_name(self, uid: bytes) -> str:
         """Get the name of a row in the database table."""
-        GET_NAME_SQL = f"SELECT {NAME_KEY} FROM {TABLE_NAME} WHERE {UID_KEY} = ?;"
         with self.cursor() as cursor:
             cursor.execute(GET_NAME_SQL, (uid,))
             name = cursor.fetchone()[0]
@@ -238,9 +562,6 @@ class SpanDataBase:
 
     def get_parent_uid(self, uid: bytes) -> bytes | None:
         """Get the parent_id of a row in the database table."""
-        GET_PARENT_UID_SQL = (
-            f"SELECT {PARENT_UID_KEY} FROM {TABLE_NAME} WHERE {UID_KEY} = ?;"
-        )
         with self.cursor() as cursor:
             cursor.execute(GET_PARENT_UID_SQL, (uid,))
             parent_id = cursor.fetchone()[0]
@@ -248,9 +569,6 @@ class SpanDataBase:
 
     def get_span_ids_from_name(self, name: str) -> list[bytes]:
         """Get all span ids with the given name."""
-        GET_SPAN_UIDS_FROM_NAME_SQL = (
-            f"SELECT {UID_KEY} FROM {TABLE_NAME} WHERE {NAME_KEY} = ?;"
-        )
         with self.cursor() as cursor:
             cursor.execute(GET_SPAN_UIDS_FROM_NAME_SQL, (name,))
             rows = cursor.fetchall()
@@ -262,9 +580,6 @@ class SpanDataBase:
 
         Assumes that the ids are ordered in ascending order, for example es generated by uuid7 or uui8.
         """
-        GET_LAST_SPAN_UID_SQL = (
-            f"SELECT {UID_KEY} FROM {TABLE_NAME} ORDER BY {UID_KEY} DESC LIMIT 1;"
-        )
         with self.cursor() as cursor:
             cursor.execute(GET_LAST_SPAN_UID_SQL)
             row = cursor.fetchone()
@@ -276,7 +591,6 @@ class SpanDataBase:
         """
         Get the uid of the last span in the database table.
         """
-        GET_LAST_UPDATED_SPAN_UID_SQL = f"SELECT {UID_KEY}, {UPDATED_TIME_KEY} FROM {TABLE_NAME} ORDER BY {UPDATED_TIME_KEY} DESC LIMIT 1;"
         with self.cursor() as cursor:
             cursor.execute(GET_LAST_UPDATED_SPAN_UID_SQL)
             row = cursor.fetchone()
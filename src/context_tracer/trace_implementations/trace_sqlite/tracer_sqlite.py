@@ -6,7 +6,7 @@ from typing import Any, Final, Self
 from context_tracer.constants import NAME_KEY
 from context_tracer.trace_types import TraceSpan, TraceTree, Tracing
 from context_tracer.utils.id_utils import new_uid
-from context_tracer.utils.json_encoder import CustomEncoder, JSONDictType
+from context_tracer.utils.json_encoder import CustomEncoder, JSONDictType, loads
 
 from .span_db import SpanDataBase
 
@@ -40,7 +40,7 @@ class TraceSpanSqlite(TraceSpan, AbstractContextManager):
 
     @property
     def data(self) -> JSONDictType:
-        return json.loads(self.span_db.get_data_json(uid=self._span_uid))
+        return loads(self.span_db.get_data_json(uid=self._span_uid))
 
     @classmethod
     def new(
@@ -52,12 +52,15 @@ class TraceSpanSqlite(TraceSpan, AbstractContextManager):
     ) -> Self:
         data_json: str = json.dumps(data, cls=CustomEncoder)
         span_uid = new_uid()
-        span_db.insert(
+        span_db.buffer_insert(
             uid=span_uid,
             name=name,
             data_json=data_json,
             parent_uid=parent_uid,
         )
+        # Write the new span right away, so readers see running spans.
+        # Only data updates stay buffered (until the next new span or exit).
+        span_db.flush()
         return cls(span_db=span_db, span_uid=span_uid)
 
     def new_child(self: Self, **data) -> Self:
@@ -68,7 +71,12 @@ class TraceSpanSqlite(TraceSpan, AbstractContextManager):
 
     def update_data(self, **new_data) -> None:
         data_json: str = json.dumps(new_data, cls=CustomEncoder)
-        self.span_db.update_data_json(uid=self._span_uid, data_json=data_json)
+        self.span_db.buffer_update_data_json(uid=self._span_uid, data_json=data_json)
+
+    def __exit__(self, *exc) -> None:
+        # Write the data buffered while the span was running
+        self.span_db.flush()
+        return None
 
 
 class TraceTreeSqlite(TraceTree):
@@ -80,13 +88,17 @@ class TraceTreeSqlite(TraceTree):
         self._span_uid = span_uid
         super().__init__()
 
+    @property
+    def uid(self) -> bytes:
+        return self._span_uid
+
     @property
     def name(self) -> str:
         return self.span_db.get_name(uid=self._span_uid)
 
     @property
     def data(self) -> JSONDictType:
-        return json.loads(self.span_db.get_data_json(uid=self._span_uid))
+        return loads(self.span_db.get_data_json(uid=self._span_uid))
 
     @property
     def parent(self: Self) -> Self | None:
@@ -136,4 +148,6 @@ class TracingSqlite(Tracing[TraceSpanSqlite, TraceTreeSqlite]):
             super().__exit__(*args, **kwargs)
         finally:
             self.span_db.wal_checkpoint()
+            # Release the connections, they are reopened if the trace is read later
+            self.span_db.close()
         return
@@ -22,6 +22,7 @@ TraceSpanType = TypeVar("TraceSpanType", bound="TraceSpan")
 TraceSpanType_return = TypeVar(
     "TraceSpanType_return", bound="TraceSpan", covariant=True
 )
+TraceTreeType = TypeVar("TraceTreeType", bound="TraceTree")
 TraceTreeType_return = TypeVar(
     "TraceTreeType_return", bound="TraceTree", covariant=True
 )
@@ -171,6 +172,34 @@ class Tracing(Protocol[TraceSpanType_return, TraceTreeType_return]):
             self._span_ctx_mngr = None
 
 
+# Walk Trace Tree ##################################################
+def walk_leaves(tree: TraceTreeType) -> Iterator[TraceTreeType]:
+    """
+    Iterate over the leaf nodes (nodes without children) under the given node.
+
+    Depth-first with an explicit stack, so deep trees don't hit the recursion limit.
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        children = node.children
+        if children:
+            stack.extend(children)
+        else:
+            yield node
+
+
+def find_by_name(tree: TraceTreeType, name: str) -> TraceTreeType | None:
+    """Return the first node (depth-first) with the given name, None if not found."""
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node.name == name:
+            return node
+        stack.extend(node.children)
+    return None
+
+
 # Manage Trace Context #############################################
 @contextlib.contextmanager
 def trace_span_context(span: TraceSpanType) -> Iterator[TraceSpanType]:
@@ -185,8 +214,12 @@ def trace_span_context(span: TraceSpanType) -> Iterator[TraceSpanType]:
         _TRACE_SPAN_IN_CONTEXT.reset(reset_token)
 
 
+# Bound once, looking up the current span is on the path of every traced call
+_get_span_in_context = _TRACE_SPAN_IN_CONTEXT.get
+
+
 def get_current_span() -> TraceSpan | None:
-    return _TRACE_SPAN_IN_CONTEXT.get()
+    return _get_span_in_context()
 
 
 def get_current_span_safe() -> TraceSpan:
@@ -196,7 +229,7 @@ def get_current_span_safe() -> TraceSpan:
     Raises:
         Exception: If no trace is running.
     """
-    current_trace: TraceSpan | None = get_current_span()
+    current_trace: TraceSpan | None = _get_span_in_context()
     if current_trace is None:
         raise TraceError(
             f"No Span is running. Run this only in the context of a `{Tracing.__name__}`!"
@@ -212,6 +245,9 @@ def get_current_span_safe_typed(T: type[TraceSpanType]) -> TraceSpanType:
         Exception: If no trace is running.
     """
     current_span: TraceSpan = get_current_span_safe()
+    # Exact type match avoids the slower (protocol) `isinstance` check
+    if type(current_span) is T:
+        return current_span  # type: ignore[return-value]
     if not isinstance(current_span, T):
         raise TraceError(
             f"Expected type {T.__name__!r}, got {type(current_span).__name__!r}!"
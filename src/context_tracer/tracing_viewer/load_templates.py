@@ -1,13 +1,13 @@
+import functools
 import html
-import json
 import logging
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlparse
 
-from jinja2 import BaseLoader, Environment
+from jinja2 import BaseLoader, Environment, Template
 
-from context_tracer.utils.json_encoder import CustomEncoder
+from context_tracer.utils.json_encoder import dumps
 from context_tracer.utils.url_utils import (
     urljoin_forward_slash,
 )
@@ -50,7 +50,7 @@ def get_flamechart_view(
             "No data provided, and no websocket url provided. Returning empty flame-chart that cannot be updated."
         )
     if data_dict:
-        data_json = json.dumps(data_dict, cls=CustomEncoder, indent=2)
+        data_json = dumps(data_dict)
         data_json = html.escape(data_json, quote=False)
     else:
         data_json = None
@@ -82,19 +82,21 @@ def get_flamechart_view(
             ]
         )
     # Render the template
-    flamechart_html_str = (
-        Environment(loader=BaseLoader())
-        .from_string(HTML_TEMPLATE.read_text())
-        .render(
-            custom_css=custom_css,
-            custom_js=custom_js,
-            websocket_url=websocket_url,
-            data_json=data_json,
-        )
+    flamechart_html_str = get_flamechart_template().render(
+        custom_css=custom_css,
+        custom_js=custom_js,
+        websocket_url=websocket_url,
+        data_json=data_json,
     )
     return flamechart_html_str
 
 
+@functools.cache
+def get_flamechart_template() -> Template:
+    """Flamechart template, read and compiled once per process."""
+    return Environment(loader=BaseLoader()).from_string(HTML_TEMPLATE.read_text())
+
+
 def create_css_href(href: str) -> str:
     return f'<link rel="stylesheet" type="text/css" href="{href}"/>'
 
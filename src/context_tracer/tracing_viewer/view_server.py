@@ -2,7 +2,6 @@ import asyncio
 import contextlib
 import functools
 import html
-import json
 import logging
 import os
 import signal
@@ -28,7 +27,7 @@ from context_tracer.utils.fast_api_utils.readiness import (
     READINESS_ENDPOINT_PATH,
     readiness_api,
 )
-from context_tracer.utils.json_encoder import CustomEncoder
+from context_tracer.utils.json_encoder import dumps
 from context_tracer.utils.logging_utils import setup_logging
 
 from .load_templates import get_flamechart_view
@@ -130,11 +129,7 @@ class ViewServerAPI:
     async def get_full_span_tree_json(self) -> str:
         """Get full tree as JSON string."""
         dict_tree = await self.get_full_span_tree()
-        tree_json = json.dumps(
-            dict_tree,
-            cls=CustomEncoder,
-            separators=(",", ":"),
-        )
+        tree_json = dumps(dict_tree)
         tree_json = html.escape(tree_json, quote=False)
         return tree_json
 
@@ -179,7 +174,10 @@ class ViewServerAPI:
         log.debug(
             f"{self.__class__.__name__}.lifespan: Checkpointed WAL on PID={os.getpid()}"
         )
-        await self._export_html()
+        try:
+            await self._export_html()
+        finally:
+            self.span_db.close()
 
     def stop_server(self, sig_num: int, *args, **kwargs) -> None:
         log.debug(f"{self.__class__.__name__}.stop_server()")
@@ -256,8 +254,21 @@ def create_view_server(
 
 
 def trace_tree_to_dict(trace_tree: TraceTree) -> dict[str, Any]:
-    return {
-        "name": trace_tree.name,
-        "data": trace_tree.data,
-        "children": [trace_tree_to_dict(child) for child in trace_tree.children],
-    }
+    """
+    Nested dict representation of the tree.
+
+    Built with an explicit stack, so deep trees don't hit the recursion limit.
+    """
+    root_dict = _trace_node_to_dict(trace_tree)
+    stack = [(trace_tree, root_dict)]
+    while stack:
+        node, node_dict = stack.pop()
+        for child in node.children:
+            child_dict = _trace_node_to_dict(child)
+            node_dict["children"].append(child_dict)
+            stack.append((child, child_dict))
+    return root_dict
+
+
+def _trace_node_to_dict(trace_tree: TraceTree) -> dict[str, Any]:
+    return {"name": trace_tree.name, "data": trace_tree.data, "children": []}
@@ -3,6 +3,7 @@ import multiprocessing as mp
 import os
 import socket
 from abc import abstractmethod
+from multiprocessing.synchronize import Event as EventType
 from types import TracebackType
 from typing import Any, Protocol, Self, runtime_checkable
 
@@ -12,6 +13,9 @@ from fastapi import FastAPI
 
 log = logging.getLogger(__name__)
 
+# Maximum number of pending connections on the listening socket (same as uvicorn's default)
+DEFAULT_BACKLOG = 2048
+
 
 class CreateAppType(Protocol):
     def __call__(self, host: str, port: int) -> FastAPI:
@@ -55,6 +59,8 @@ class FastAPIProcessRunner(ServerContextProtocol):
     _socket: socket.socket | None = None
     _proc: mp.Process | None = None
     _url: str | None = None
+    # Set by the server process once it is accepting connections
+    _ready_event: EventType | None = None
     # Function to create the FastAPI application (needed to avoid FastAPI pickling issues)
     _create_app: CreateAppType
     _uvicorn_server_kwargs: dict[str, Any]
@@ -78,7 +84,22 @@ class FastAPIProcessRunner(ServerContextProtocol):
         assert self._url is not None, "Server not started!"
         return self._url
 
-    def _run(self, sockets: list[socket.socket]) -> None:
+    @property
+    def ready_event(self) -> EventType:
+        """Event that is set once the server has started up and accepts connections."""
+        assert self._ready_event is not None, "Server not started!"
+        return self._ready_event
+
+    def is_ready(self) -> bool:
+        """Return True if the server has started up, without making a request."""
+        return self._ready_event is not None and self._ready_event.is_set()
+
+    def wait_for_ready(self, timeout_sec: float = 30) -> None:
+        """Block until the server has started up."""
+        if not self.ready_event.wait(timeout=timeout_sec):
+            raise TimeoutError("Timed out waiting for server to be ready.")
+
+    def _run(self, sockets: list[socket.socket], ready_event: EventType) -> None:
         """
         Run the server in the current process.
         """
@@ -89,7 +110,8 @@ class FastAPIProcessRunner(ServerContextProtocol):
         log_config["loggers"] = {}
         self._uvicorn_server_kwargs["log_config"] = log_config
         server = ServerNoSignalHandler(
-            config=uvicorn.Config(app, **self._uvicorn_server_kwargs)
+            config=uvicorn.Config(app, **self._uvicorn_server_kwargs),
+            ready_event=ready_event,
         )
         log.debug(f"Starting server on {self.host}:{self.port} on PID={os.getpid()}")
         server.run(sockets=sockets)
@@ -104,13 +126,15 @@ class FastAPIProcessRunner(ServerContextProtocol):
         # Setup socket separately to get the actual port assigned (in case port=0 was used)
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._socket.bind((self.host, self.port))
-        self._socket.listen(1)
+        # Same backlog as uvicorn uses once it serves, so early connections are queued too
+        self._socket.listen(self._uvicorn_server_kwargs.get("backlog", DEFAULT_BACKLOG))
         # Overwrite self.port with actual port assigned (in case port=0 was used)
         self.port = self._socket.getsockname()[1]
         # Start server in new process
+        self._ready_event = mp.Event()
         self._proc = mp.Process(
             target=self._run,
-            kwargs=dict(sockets=[self._socket]),
+            kwargs=dict(sockets=[self._socket], ready_event=self._ready_event),
             daemon=True,
         )
         self._proc.start()
@@ -159,10 +183,22 @@ class ServerNoSignalHandler(uvicorn.Server):
 
     Do this to allow custom signal handling in the parent process.
 
+    Signals `ready_event` once startup has finished, so the parent process doesn't
+    have to poll the server to know when it is accepting connections.
+
     Related:
     - https://github.com/encode/uvicorn/issues/1579
     """
 
+    def __init__(self, config: uvicorn.Config, ready_event: EventType | None = None):
+        super().__init__(config=config)
+        self._ready_event = ready_event
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started and self._ready_event is not None:
+            self._ready_event.set()
+
     def install_signal_handlers(self):
         pass
         super().install_signal_handlers()
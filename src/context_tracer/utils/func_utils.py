@@ -1,6 +1,9 @@
 import inspect
 from collections.abc import Callable
-from typing import Any
+from typing import Any, Final
+
+# Key for positional arguments of functions without an introspectable signature
+POSITIONAL_ARGS_KEY: Final[str] = "*args"
 
 
 def func2str(func: Callable) -> str:
@@ -8,9 +11,31 @@ def func2str(func: Callable) -> str:
     return getattr(func, "__name__", repr(func))
 
 
+def get_func_signature(func: Callable) -> inspect.Signature | None:
+    """Get the signature of the function, None if it can't be introspected."""
+    try:
+        return inspect.signature(func)
+    except (TypeError, ValueError):
+        # E.g. some builtins, like `max`, don't expose a signature
+        return None
+
+
 def get_func_bound_args(func: Callable, *args, **kwargs) -> dict[str, Any]:
     """Get the kwargs dict of all arguments bounded to the function signature."""
-    sig = inspect.signature(func)
+    return bind_func_args(get_func_signature(func), *args, **kwargs)
+
+
+def bind_func_args(sig: inspect.Signature | None, *args, **kwargs) -> dict[str, Any]:
+    """
+    Get the kwargs dict of all arguments bounded to the given function signature.
+
+    Takes the signature instead of the function, so it can be computed once per function.
+    If there is no signature, positional arguments are returned under `POSITIONAL_ARGS_KEY`.
+    """
+    if sig is None:
+        if args:
+            return {POSITIONAL_ARGS_KEY: args, **kwargs}
+        return kwargs
     bound = sig.bind(*args, **kwargs)
     bound.apply_defaults()
     return bound.arguments
@@ -1,7 +1,11 @@
 import dataclasses
 import json
 import logging
+import traceback
+import uuid
 from datetime import datetime, timedelta
+from enum import Enum
+from types import TracebackType
 from typing import (
     Any,
     NamedTuple,
@@ -13,6 +17,11 @@ from pydantic import BaseModel
 
 from context_tracer.utils.time_utils import format_timedelta
 
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the standard library
+    orjson = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +33,18 @@ JSONType: TypeAlias = (
 JSONDictType = dict[str, JSONType]
 
 
+# JSON Decoder #####################################################
+def loads(data: str | bytes) -> Any:
+    """Deserialize a JSON document, using `orjson` if it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # E.g. `NaN` or `Infinity` written by the standard library encoder
+            pass
+    return json.loads(data)
+
+
 # JSON Encoder #####################################################
 class CustomEncoder(json.JSONEncoder):
     def default(self, obj: Any):
@@ -31,6 +52,52 @@ class CustomEncoder(json.JSONEncoder):
         return make_serializable_base(obj)
 
 
+def dumps(obj: Any) -> str:
+    """
+    Serialize `obj` to a compact JSON string, using `orjson` if it is installed.
+
+    Meant for output that is parsed by a browser (e.g. the viewer), `orjson` writes
+    `NaN` and infinities as `null` where the standard library writes invalid JSON.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj,
+                default=_orjson_default,
+                # Same output as `CustomEncoder`: serialize these with `_orjson_default`
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_PASSTHROUGH_DATACLASS
+                    | orjson.OPT_PASSTHROUGH_SUBCLASS
+                    | orjson.OPT_NON_STR_KEYS
+                ),
+            ).decode()
+        except orjson.JSONEncodeError:
+            # E.g. integers larger than 64 bit
+            pass
+    return json.dumps(obj, cls=CustomEncoder, separators=(",", ":"))
+
+
+def _orjson_default(obj: Any) -> Any:
+    """
+    `default` for `orjson.dumps` that matches the output of `CustomEncoder`.
+
+    Subclasses of types that `json` encodes natively (e.g. namedtuples) are passed
+    through by `orjson`, convert them like `json` does.
+    """
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    if isinstance(obj, float):
+        return float(obj)
+    if isinstance(obj, dict):
+        return dict(obj)
+    if isinstance(obj, list | tuple):
+        return list(obj)
+    return make_serializable_base(obj)
+
+
 # Make serializable ################################################
 @overload
 def make_serializable(obj: dict) -> JSONDictType:
@@ -76,6 +143,15 @@ def make_serializable_base(obj: Any) -> JSONType:
         return obj.isoformat(sep=" ")
     if isinstance(obj, timedelta):
         return format_timedelta(obj)
+    if isinstance(obj, Enum):
+        # Same as `orjson`, which always serializes enums by value
+        return make_serializable(obj.value)
+    if isinstance(obj, uuid.UUID):
+        # Same as `orjson`, which always serializes UUIDs natively
+        return str(obj)
+    if isinstance(obj, TracebackType):
+        # Tracebacks are kept as objects and only formatted when serialized
+        return "".join(traceback.format_tb(obj))
     if isnamedtuple(obj):
         return serialize_namedtuple(obj)
     if dataclasses.is_dataclass(obj):
@@ -1,12 +1,19 @@
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Final
 
 
 def get_utc_timestamp() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# Local UTC offset, resolved once at import since `astimezone()` queries the OS
+# timezone on every call. Timestamps stay correct instants if the offset changes
+# later on (e.g. DST), they are just expressed in the offset at import time.
+_LOCAL_TIMEZONE: Final[tzinfo | None] = datetime.now(timezone.utc).astimezone().tzinfo
+
+
 def get_local_timestamp() -> datetime:
-    return datetime.now(timezone.utc).astimezone()
+    return datetime.now(_LOCAL_TIMEZONE)
 
 
 def format_timedelta(td: timedelta) -> str:
@@ -9,7 +9,6 @@ from typing import (
     Protocol,
     TypeVar,
     overload,
-    runtime_checkable,
 )
 
 logger = logging.getLogger(__name__)
@@ -19,7 +18,6 @@ logger = logging.getLogger(__name__)
 _T_co = TypeVar("_T_co", covariant=True)
 
 
-@runtime_checkable
 class ContextManagerProtocol(Protocol[_T_co]):
     """
     From https://github.com/python/typeshed/blob/1459adc/stdlib/contextlib.pyi#L40-L46
@@ -1,4 +1,3 @@
-from functools import reduce
 from urllib.parse import parse_qs, quote, urlencode, urlparse
 
 
@@ -10,8 +9,17 @@ def join_slash(a: str, b: str) -> str:
 def urljoin_forward_slash(*args: str) -> str:
     """
     Join all arguments to have only a single forward slash (/) between them.
+
+    Same result as `reduce(join_slash, args)`, but with a single join.
     """
-    return reduce(join_slash, args) if args else ""
+    if len(args) < 2:
+        return args[0] if args else ""
+    first, *middle, last = args
+    parts = [first.rstrip("/")]
+    # Parts that are only slashes collapse into the surrounding single slash
+    parts.extend(part for part in (arg.strip("/") for arg in middle) if part)
+    parts.append(last.lstrip("/"))
+    return "/".join(parts)
 
 
 def parse_url_query_safe(url: str) -> dict[str, str | list[str]]:
@@ -36,5 +44,5 @@ def create_query_url(url: str, params: dict) -> str:
     More info:
     - https://en.wikipedia.org/wiki/Query_string
     """
-    query: str = urlencode(query=params, doseq=True, quote_via=quote)
-    return f"{url}?{query}"
+    # `quote` (not `quote_plus`) so spaces are encoded as `%20` instead of `+`
+    return url + "?" + urlencode(query=params, doseq=True, quote_via=quote)
@@ -0,0 +1,14 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Serialize `obj` to a JSON string, using orjson if available."""
+    if orjson is None:
+        return json.dumps(obj)
+    return orjson.dumps(obj).decode()
@@ -0,0 +1,36 @@
+"""
+Sample traced program shared by the tracing tests.
+
+Functions are decorated once at import time and produce the following trace tree:
+C -> (B -> (A, D), B -> (A, D), E)
+"""
+
+from context_tracer.trace import log_with_trace, trace
+
+
+@trace
+def do_a():
+    log_with_trace(name="A", test_var="Hello World From A!")
+
+
+@trace
+def do_d():
+    log_with_trace(name="D", test_var="Hello World From D!")
+
+
+@trace
+def do_e():
+    log_with_trace(name="E", test_var="Hello World From E!")
+
+
+@trace
+def do_b():
+    do_a()
+    do_d()
+
+
+@trace(name="C")
+def do_c():
+    do_b()
+    do_b()
+    do_e()
@@ -1 +1,19 @@
-# TODO: Test
+import contextvars
+
+from context_tracer.concurrency.context_propagation import CtxThreadPoolExecutor
+
+_TEST_VAR = contextvars.ContextVar[str | None]("TEST_VAR", default=None)
+
+
+def test_CtxThreadPoolExecutor_context_propagation() -> None:
+    reset_token = _TEST_VAR.set("submit-context")
+    try:
+        with CtxThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(_TEST_VAR.get) for _ in range(4)]
+            assert [future.result() for future in futures] == ["submit-context"] * 4
+            # Context at the time of submitting is used, not when creating the executor
+            _TEST_VAR.set("new-context")
+            assert executor.submit(_TEST_VAR.get).result() == "new-context"
+    finally:
+        _TEST_VAR.reset(reset_token)
+    assert _TEST_VAR.get() is None
@@ -1,19 +1,13 @@
-import tempfile
-from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
 
 
 @pytest.fixture
-def tmp_db_path() -> Iterator[Path]:
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        db_path = Path(tmp_dir) / "trace.db"
-        yield db_path
+def tmp_db_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return tmp_path_factory.mktemp("db") / "trace.db"
 
 
 @pytest.fixture
-def tmp_log_path() -> Iterator[Path]:
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        log_path = Path(tmp_dir) / "trace.log"
-        yield log_path
+def tmp_log_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return tmp_path_factory.mktemp("log") / "trace.log"
@@ -1,19 +1,41 @@
 from collections.abc import Iterator
-from pathlib import Path
 
 import pytest
+from context_tracer.concurrency import TraceProcessPoolExecutor
 from context_tracer.trace_implementations.trace_server.trace_server import (
     SpanClientAPI,
     create_span_server,
 )
+from context_tracer.utils.fast_api_utils import FastAPIProcessRunner
 
 
-@pytest.fixture
-def tmp_api_client(tmp_db_path: Path) -> Iterator[SpanClientAPI]:
-    server = create_span_server(db_path=tmp_db_path)
+# Session fixtures are created once per pytest-xdist worker process, so the span server is
+# only shared within a worker. Tests using it are marked `xdist_group(name="trace_server")`
+# so that `pytest -n auto --dist loadgroup` runs them on the same worker (one server).
+# A worker that starts its own server gets its own DB (`tmp_path_factory`) and port (port=0).
+@pytest.fixture(scope="session")
+def session_server(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator[FastAPIProcessRunner]:
+    """
+    Span server shared by all tests in the session.
+
+    Tests should only use freshly generated span uids so they don't interfere.
+    """
+    db_path = tmp_path_factory.mktemp("span_server") / "trace.sqlite"
+    server = create_span_server(db_path=db_path)
     with server:
-        url = f"http://localhost:{server.port}"
-        client = SpanClientAPI(url=url)
-        client.wait_for_ready()
-        assert client.is_ready()
-        yield client
+        server.wait_for_ready(timeout_sec=5)
+        yield server
+
+
+@pytest.fixture(scope="session")
+def tmp_api_client(session_server: FastAPIProcessRunner) -> SpanClientAPI:
+    return SpanClientAPI(url=session_server.url)
+
+
+@pytest.fixture(scope="module")
+def trace_pool() -> Iterator[TraceProcessPoolExecutor]:
+    """Process pool shared by the tests in a module, to avoid starting new workers."""
+    with TraceProcessPoolExecutor(max_workers=2) as executor:
+        yield executor
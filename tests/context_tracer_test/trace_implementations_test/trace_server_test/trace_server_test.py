@@ -1,23 +1,16 @@
-import json
-import tempfile
-from collections.abc import Iterator
-from pathlib import Path
+import pickle
+from collections import Counter
 
 import pytest
 from context_tracer.trace_implementations.trace_server.trace_server import (
     SpanClientAPI,
     SpanDict,
     SpanPayload,
-    create_span_server,
 )
 from context_tracer.utils.id_utils import new_uid
+from context_tracer_test._json_utils import dumps as _dumps
 
-
-@pytest.fixture
-def tmp_db_path() -> Iterator[Path]:
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        db_path = Path(tmp_dir) / "trace.sqlite"
-        yield db_path
+pytestmark = pytest.mark.xdist_group(name="trace_server")
 
 
 def test_span_payload() -> None:
@@ -26,36 +19,30 @@ def test_span_payload() -> None:
     name = "test123"
     span = SpanPayload.from_bytes_ids(
         name=name,
-        data_json=json.dumps(data),
+        data_json=_dumps(data),
         parent_uid=parent_uid,
     )
     assert span.name == name
-    assert span.data_json == json.dumps(data)
+    assert span.data_json == _dumps(data)
     assert span.parent_uid_bytes == parent_uid
     assert span.parent_uid == SpanPayload.uid_to_str(parent_uid)
 
 
-def test_running_server(tmp_db_path: Path) -> None:
+def test_running_server(tmp_api_client: SpanClientAPI) -> None:
     span_dict: SpanDict = {
         "uid": new_uid(),
         "name": "test",
         "data": {"test": "test"},
         "parent_uid": None,
     }
-    server = create_span_server(db_path=tmp_db_path)
-    with server:
-        url = f"http://localhost:{server.port}"
-        client = SpanClientAPI(url=url)
-        client.wait_for_ready()
-        assert client.is_ready()
-        # Create span
-        client.put_new_span(**span_dict)
-        # Get span
-        same_span = client.get_span(uid=span_dict["uid"])
-        assert same_span == span_dict
+    # Create span
+    tmp_api_client.put_new_span(**span_dict)
+    # Get span
+    same_span = tmp_api_client.get_span(uid=span_dict["uid"])
+    assert same_span == span_dict
 
 
-def test_span_client_api_patch_update_span(tmp_db_path: Path) -> None:
+def test_span_client_api_patch_update_span(tmp_api_client: SpanClientAPI) -> None:
     data_orig = {"a": 1, "b": 2}
     span_dict: SpanDict = {
         "uid": new_uid(),
@@ -63,26 +50,20 @@ def test_span_client_api_patch_update_span(tmp_db_path: Path) -> None:
         "data": data_orig,
         "parent_uid": None,
     }
-    server = create_span_server(db_path=tmp_db_path)
-    with server:
-        url = f"http://localhost:{server.port}"
-        client = SpanClientAPI(url=url)
-        client.wait_for_ready()
-        assert client.is_ready()
-        # Create span
-        client.put_new_span(**span_dict)
-        # Get span
-        same_span = client.get_span(uid=span_dict["uid"])
-        assert same_span == span_dict
-        # Update span
-        new_data = {"b": 3, "c": 4}
-        client.patch_update_span(uid=span_dict["uid"], data=new_data)
-        # Get span
-        same_span = client.get_span(uid=span_dict["uid"])
-        assert same_span["data"] == data_orig | new_data
+    # Create span
+    tmp_api_client.put_new_span(**span_dict)
+    # Get span
+    same_span = tmp_api_client.get_span(uid=span_dict["uid"])
+    assert same_span == span_dict
+    # Update span
+    new_data = {"b": 3, "c": 4}
+    tmp_api_client.patch_update_span(uid=span_dict["uid"], data=new_data)
+    # Get span
+    same_span = tmp_api_client.get_span(uid=span_dict["uid"])
+    assert same_span["data"] == data_orig | new_data
 
 
-def test_span_client_api_get_children_uids(tmp_db_path: Path) -> None:
+def test_span_client_api_get_children_uids(tmp_api_client: SpanClientAPI) -> None:
     span_1_dict: SpanDict = {
         "uid": new_uid(),
         "name": "test_1",
@@ -101,21 +82,39 @@ def test_span_client_api_get_children_uids(tmp_db_path: Path) -> None:
         "data": {"test": "test"},
         "parent_uid": span_1_dict["uid"],
     }
-    server = create_span_server(db_path=tmp_db_path)
-    with server:
-        url = f"http://localhost:{server.port}"
-        client = SpanClientAPI(url=url)
-        client.wait_for_ready()
-        assert client.is_ready()
-        # Create spans
-        client.put_new_span(**span_1_dict)
-        client.put_new_span(**span_2_dict)
-        client.put_new_span(**span_3_dict)
-        # Get Children of span_1
-        children = client.get_children_uids(uid=span_1_dict["uid"])
-        assert set(children) == set([span_2_dict["uid"], span_3_dict["uid"]])
-        # Get Children of span_2
-        children = client.get_children_uids(uid=span_2_dict["uid"])
-        assert children == []
-        # Get Children of span_3
-        children = client.get_children_uids(uid=span_3_dict["uid"])
+    # Create spans
+    tmp_api_client.put_new_spans([span_1_dict, span_2_dict, span_3_dict])
+    for span_dict in [span_1_dict, span_2_dict, span_3_dict]:
+        assert tmp_api_client.get_span(uid=span_dict["uid"]) == span_dict
+    # Get Children of span_1
+    children = tmp_api_client.get_children_uids(uid=span_1_dict["uid"])
+    assert Counter(children) == Counter([span_2_dict["uid"], span_3_dict["uid"]])
+    # Get Children of span_2
+    children = tmp_api_client.get_children_uids(uid=span_2_dict["uid"])
+    assert children == []
+    # Get Children of span_3
+    children = tmp_api_client.get_children_uids(uid=span_3_dict["uid"])
+
+
+def test_span_client_api_buffered_writes(tmp_api_client: SpanClientAPI) -> None:
+    span_dict: SpanDict = {
+        "uid": new_uid(),
+        "name": "test",
+        "data": {"a": 1, "b": 2},
+        "parent_uid": None,
+    }
+    tmp_api_client.buffer_new_span(**span_dict)
+    tmp_api_client.buffer_update_span(uid=span_dict["uid"], data={"b": 3})
+    tmp_api_client.buffer_update_span(uid=span_dict["uid"], data={"c": 4})
+    # Reads flush the buffered writes, updates are applied in order
+    same_span = tmp_api_client.get_span(uid=span_dict["uid"])
+    assert same_span["data"] == {"a": 1, "b": 3, "c": 4}
+    assert same_span["name"] == span_dict["name"]
+
+
+def test_span_client_api_buffer_copy(tmp_api_client: SpanClientAPI) -> None:
+    uid = new_uid()
+    tmp_api_client.buffer_new_span(uid=uid, name="test", data={}, parent_uid=None)
+    # Pickling sends the buffered writes, the copy starts with an empty buffer
+    client_copy: SpanClientAPI = pickle.loads(pickle.dumps(tmp_api_client))
+    assert client_copy.get_span(uid=uid)["name"] == "test"
@@ -33,7 +33,7 @@ def multiprocess_start_method(start_method: str) -> Iterator[None]:
 
 
 def id_hash(id: bytes) -> str:
-    return hashlib.md5(id).hexdigest()
+    return hashlib.blake2b(id, digest_size=16).hexdigest()
 
 
 @trace
@@ -42,7 +42,7 @@ def remote_doubling_function(test_param: int):
     This function needs to be defined in global scope to be picklable for multiprocessing.
     """
     span = get_current_span_safe_typed(TraceSpanRemote)
-    span.update_data(id_md5=id_hash(span.uid))
+    span.update_data(id_hash=id_hash(span.uid))
     return test_param * 2
 
 
@@ -68,8 +68,10 @@ def test_trace_process(tmp_db_path: Path, mp_start_method: str) -> None:
     log.info(
         f"test_trace_process(tmp_db_path={tmp_db_path}, mp_start_method={mp_start_method})"
     )
-    with multiprocess_start_method(mp_start_method):
-        with TracingRemote(db_path=tmp_db_path) as tracing:
+    with TracingRemote(db_path=tmp_db_path) as tracing:
+        # Only the traced process uses the start method under test,
+        # the trace server is started with the default start method.
+        with multiprocess_start_method(mp_start_method):
             proc = TraceProcess(
                 target=remote_doubling_function,
                 args=(1,),
@@ -77,20 +79,26 @@ def test_trace_process(tmp_db_path: Path, mp_start_method: str) -> None:
             proc.start()
             proc.join()
 
-        tree_root = tracing.tree
-        assert isinstance(tree_root, TraceTree)
-        root_children = tree_root.children
-        assert len(root_children) == 1
-        child = root_children[0]
-        assert child.name == remote_doubling_function.__name__
+    tree_root = tracing.tree
+    assert isinstance(tree_root, TraceTree)
+    root_children = tree_root.children
+    assert len(root_children) == 1
+    child = root_children[0]
+    assert child.name == remote_doubling_function.__name__
 
 
-def test_trace_process_pool(tmp_db_path: Path) -> None:
+def test_trace_process_pool(
+    tmp_db_path: Path, trace_pool: TraceProcessPoolExecutor
+) -> None:
     nb_children = 3
     with TracingRemote(db_path=tmp_db_path) as tracing:
-        with TraceProcessPoolExecutor(max_workers=2) as executor:
-            for i in range(nb_children):
-                executor.submit(remote_doubling_function, i)
+        futures = [
+            trace_pool.submit(remote_doubling_function, i) for i in range(nb_children)
+        ]
+        # Wait for all tasks to finish before the tracing is closed
+        assert [future.result() for future in futures] == [
+            i * 2 for i in range(nb_children)
+        ]
 
     tree_root = tracing.tree
     assert isinstance(tree_root, TraceTree)
@@ -1,11 +1,13 @@
 import logging
 from pathlib import Path
 
-from context_tracer.trace import get_current_span_safe, log_with_trace, trace
+from context_tracer.trace import get_current_span_safe, trace
 from context_tracer.trace_implementations.trace_server.tracer_remote import (
     TracingRemote,
 )
+from context_tracer.trace_implementations.trace_sqlite.span_db import SpanDataBase
 from context_tracer.trace_types import TraceSpan, TraceTree, Tracing
+from context_tracer_test._sample_program import do_c as program_entry
 
 
 def test_trace_remote(tmp_db_path: Path, tmp_log_path: Path) -> None:
@@ -16,7 +18,9 @@ def test_trace_remote(tmp_db_path: Path, tmp_log_path: Path) -> None:
         assert isinstance(tracing, Tracing)
         assert tracing.root_span is not None
         assert isinstance(tracing.root_span, TraceSpan)
-        # Check API client
+        # Check server and API client
+        assert tracing._server is not None
+        assert tracing._server.is_ready()
         assert tracing._api_client is not None
         assert tracing._api_client.is_ready()
     assert tmp_db_path.exists()
@@ -26,61 +30,36 @@ def test_trace_remote(tmp_db_path: Path, tmp_log_path: Path) -> None:
 
 
 def test_trace_remote_program(tmp_db_path: Path) -> None:
-    def program():
-        @trace
-        def do_a():
-            log_with_trace(name="A", test_var="Hello World From A!")
-
-        @trace
-        def do_d():
-            log_with_trace(name="D", test_var="Hello World From D!")
-
-        @trace
-        def do_e():
-            log_with_trace(name="E", test_var="Hello World From E!")
-
-        @trace
-        def do_b():
-            do_a()
-            do_d()
-
-        @trace(name="C")
-        def do_c():
-            do_b()
-            do_b()
-            do_e()
-
-        do_c()
-
     with TracingRemote(db_path=tmp_db_path) as tracing:
-        program()
+        program_entry()
     tree_root = tracing.tree
     assert isinstance(tree_root, TraceTree)
     assert tree_root.name == "root"
     assert len(tree_root.children) == 1
 
-    def get_leafs(tree_root: TraceTree) -> list[TraceTree]:
-        if len(tree_root.children) == 0:
-            return [tree_root]
-        leafs = []
-        for child in tree_root.children:
-            leafs.extend(get_leafs(child))
-        return leafs
+    span_db = tracing.span_db
+    leaf_uids = span_db.get_leaf_uids(root_uid=tree_root.uid)
+    assert len(leaf_uids) == 5
+    for leaf_uid in leaf_uids:
+        assert span_db.get_name(uid=leaf_uid) in {"A", "D", "E"}
 
-    leafs = get_leafs(tree_root)
-    assert len(leafs) == 5
-    for leaf in leafs:
-        assert leaf.name in {"A", "D", "E"}
+    assert span_db.get_span_name_exists(root_uid=tree_root.uid, name="C")
 
-    def found_c(tree_root: TraceTree) -> bool:
-        if tree_root.name == "C":
-            return True
-        for child in tree_root.children:
-            if found_c(child):
-                return True
-        return False
 
-    assert found_c(tree_root)
+def test_running_span_visible_to_other_reader(tmp_db_path: Path) -> None:
+    @trace(name="running")
+    def check_visible() -> None:
+        span = get_current_span_safe()
+        # Read the database directly, like the viewer does while the trace runs
+        reader = SpanDataBase(db_path=tmp_db_path)
+        try:
+            assert reader.get_root_span_count() == 1
+            assert reader.get_name(uid=span.uid) == "running"
+        finally:
+            reader.close()
+
+    with TracingRemote(db_path=tmp_db_path):
+        check_visible()
 
 
 def test_update_data(tmp_db_path: Path) -> None:
@@ -1,7 +1,10 @@
+import concurrent.futures
+import itertools
 import json
-import tempfile
-import time
-import uuid
+import pickle
+import sqlite3
+import threading
+from collections import Counter
 from collections.abc import Iterator
 from pathlib import Path
 
@@ -10,25 +13,144 @@ from context_tracer.trace_implementations.trace_sqlite.span_db import (
     SpanDataBase,
     SpanDbRow,
 )
-from context_tracer.utils.id_utils import new_uid
+from context_tracer_test._json_utils import dumps as _dumps
 
+_uid_counter = itertools.count()
 
-@pytest.fixture
+
+def _uid() -> bytes:
+    """
+    Cheap unique (and increasing) 16 byte uid for tests.
+
+    Only needs to be unique within the tests, no need for `new_uid`'s randomness.
+    """
+    return next(_uid_counter).to_bytes(16, "big")
+
+
+@pytest.fixture(scope="module")
 def tmp_db() -> Iterator[SpanDataBase]:
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        db_path = Path(tmp_dir) / "trace.sqlite"
-        db = SpanDataBase(db_path=db_path)
-        yield db
+    span_db = SpanDataBase()
+    yield span_db
+    span_db.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_tmp_db(tmp_db: SpanDataBase) -> None:
+    """Start each test with an empty database."""
+    tmp_db.reset()
+
+
+def test_file_db(tmp_db_path: Path) -> None:
+    span = SpanDbRow(
+        uid=_uid(),
+        name="test",
+        data_json='{"test_key": "test_val"}',
+        parent_uid=None,
+    )
+    span_db = SpanDataBase(db_path=tmp_db_path)
+    span_db.insert(*span.as_tuple())
+    span_db.close()
+    assert tmp_db_path.exists()
+    # Data is persisted when opening the same database file again
+    span_db_reopened = SpanDataBase(db_path=tmp_db_path)
+    assert span_db_reopened.get_span(uid=span.uid) == span
+    span_db_reopened.close()
+
+
+def test_file_db_pickle(tmp_db_path: Path) -> None:
+    span_db = SpanDataBase(db_path=tmp_db_path)
+    span = SpanDbRow(
+        uid=_uid(),
+        name="test",
+        data_json="{}",
+        parent_uid=None,
+    )
+    span_db.insert(*span.as_tuple())
+    # Cached connections are not pickled, a new one is created on use
+    span_db_copy = pickle.loads(pickle.dumps(span_db))
+    assert span_db_copy.get_span(uid=span.uid) == span
+    span_db.close()
+    span_db_copy.close()
+
+
+def test_memory_db_pickle(tmp_db: SpanDataBase) -> None:
+    # The in-memory database can't be shared with a copy
+    with pytest.raises(TypeError, match="in-memory"):
+        pickle.dumps(tmp_db)
+
+
+def test_memory_db_usable_after_close() -> None:
+    span_db = SpanDataBase()
+    span = SpanDbRow(uid=_uid(), name="test", data_json="{}", parent_uid=None)
+    span_db.insert(*span.as_tuple())
+    span_db.close()
+    # Closing only closes the cached connections, the in-memory data is kept
+    assert span_db.get_root_uids() == [span.uid]
+    assert span_db.get_span(uid=span.uid) == span
+    span_db.close()
+
+
+def test_connection_per_thread(tmp_db: SpanDataBase) -> None:
+    with tmp_db.connect_db() as conn_main:
+        pass
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        conn_thread = executor.submit(tmp_db._get_connection).result()
+    # Connection is reused within a thread, but not shared between threads
+    with tmp_db.connect_db() as conn_main_again:
+        assert conn_main_again is conn_main
+    assert conn_thread is not conn_main
+
+
+def test_finished_thread_connections_closed(tmp_db: SpanDataBase) -> None:
+    for _ in range(50):
+        thread = threading.Thread(target=tmp_db.get_root_uids)
+        thread.start()
+        thread.join()
+    # Connections of finished threads are closed when the next one is created,
+    # only the main thread's and the last thread's connection can be left
+    assert len(tmp_db._connections) <= 2
+
+
+def test_file_db_pragmas(tmp_db_path: Path) -> None:
+    span_db = SpanDataBase(db_path=tmp_db_path)
+    with span_db.cursor() as cursor:
+        assert cursor.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+        # 1 == NORMAL
+        assert cursor.execute("PRAGMA synchronous;").fetchone()[0] == 1
+        assert cursor.execute("PRAGMA busy_timeout;").fetchone()[0] == 5000
+    span_db.close()
+
+
+@pytest.mark.parametrize(
+    "query, index_name",
+    [
+        ("SELECT uid FROM trace_spans WHERE name = ?;", "idx_trace_spans_name"),
+        (
+            "SELECT uid FROM trace_spans WHERE parent_uid = ?;",
+            "idx_trace_spans_parent_uid",
+        ),
+        (
+            "SELECT uid FROM trace_spans WHERE parent_uid IS NULL;",
+            "idx_trace_spans_root",
+        ),
+    ],
+)
+def test_query_uses_index(tmp_db: SpanDataBase, query: str, index_name: str) -> None:
+    nb_params = query.count("?")
+    with tmp_db.cursor() as cursor:
+        plan = cursor.execute(f"EXPLAIN QUERY PLAN {query}", (b"x",) * nb_params)
+        plan_details = " ".join(row[-1] for row in plan.fetchall())
+    assert index_name in plan_details
 
 
 def test_insert(tmp_db: SpanDataBase) -> None:
     span = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="test",
         data_json='{"test_key": "test_val"}',
         parent_uid=None,
     )
-    tmp_db.insert(**span.model_dump())
+    tmp_db.insert(*span.as_tuple())
     retrieved_span = tmp_db.get_span(uid=span.uid)
     assert retrieved_span == span
     assert tmp_db.get_name(uid=span.uid) == span.name
@@ -40,12 +162,12 @@ def test_insert(tmp_db: SpanDataBase) -> None:
 
 def test_insert_or_update(tmp_db: SpanDataBase) -> None:
     span = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="test",
         data_json='{"test_key": "test_val"}',
         parent_uid=None,
     )
-    tmp_db.insert_or_update(**span.model_dump())
+    tmp_db.insert_or_update(*span.as_tuple())
     assert tmp_db.get_span(uid=span.uid) == span
     assert tmp_db.get_name(uid=span.uid) == span.name
     assert tmp_db.get_parent_uid(uid=span.uid) == span.parent_uid is None
@@ -53,7 +175,7 @@ def test_insert_or_update(tmp_db: SpanDataBase) -> None:
     assert tmp_db.get_root_uids() == [span.uid]
     assert tmp_db.get_children_uids(uid=span.uid) == []
     # Update with same span should not change anything
-    tmp_db.insert_or_update(**span.model_dump())
+    tmp_db.insert_or_update(*span.as_tuple())
     assert tmp_db.get_span(uid=span.uid) == span
     assert tmp_db.get_name(uid=span.uid) == span.name
     assert tmp_db.get_parent_uid(uid=span.uid) == span.parent_uid is None
@@ -64,52 +186,61 @@ def test_insert_or_update(tmp_db: SpanDataBase) -> None:
 
 def test_get_root_id_empty_db(tmp_db: SpanDataBase) -> None:
     assert tmp_db.get_root_uids() == []
+    assert tmp_db.get_root_span_count() == 0
+
+
+def test_reset(tmp_db: SpanDataBase) -> None:
+    span = SpanDbRow(uid=_uid(), name="test", data_json="{}", parent_uid=None)
+    tmp_db.insert(*span.as_tuple())
+    assert tmp_db.get_root_uids() == [span.uid]
+    tmp_db.reset()
+    assert tmp_db.get_root_uids() == []
 
 
 def test_multiple_roots(tmp_db: SpanDataBase) -> None:
     # This should ideally not happen, but we should be able to handle it
     parent_span1 = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="parent_1",
         data_json='{"test_key": "test_val"}',
         parent_uid=None,
     )
     parent_span2 = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="parent_2",
         data_json='{"test_key": "test_val"}',
         parent_uid=None,
     )
-    tmp_db.insert_or_update(**parent_span1.model_dump())
-    tmp_db.insert_or_update(**parent_span2.model_dump())
-    assert set(tmp_db.get_root_uids()) == set([parent_span1.uid, parent_span2.uid])
+    tmp_db.insert_or_update_many([parent_span1, parent_span2])
+    assert Counter(tmp_db.get_root_uids()) == Counter(
+        [parent_span1.uid, parent_span2.uid]
+    )
+    assert tmp_db.get_root_span_count() == 2
 
 
 def test_parent_child(tmp_db: SpanDataBase) -> None:
     parent_span = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="parent",
         data_json='{"test_key": "test_val"}',
         parent_uid=None,
     )
     child1_span = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="child_1",
         data_json='{"test_key": "test_val"}',
         parent_uid=parent_span.uid,
     )
     child2_span = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="child_2",
         data_json='{"test_key": "test_val"}',
         parent_uid=parent_span.uid,
     )
-    tmp_db.insert_or_update(**parent_span.model_dump())
-    tmp_db.insert_or_update(**child1_span.model_dump())
-    tmp_db.insert_or_update(**child2_span.model_dump())
+    tmp_db.insert_or_update_many([parent_span, child1_span, child2_span])
     # Checks
     assert tmp_db.get_root_uids() == [parent_span.uid]
-    assert set(tmp_db.get_children_uids(uid=parent_span.uid)) == set(
+    assert Counter(tmp_db.get_children_uids(uid=parent_span.uid)) == Counter(
         [
             child1_span.uid,
             child2_span.uid,
@@ -122,17 +253,34 @@ def test_parent_child(tmp_db: SpanDataBase) -> None:
     assert tmp_db.get_parent_uid(uid=child2_span.uid) == parent_span.uid
 
 
+def test_get_leaf_uids(tmp_db: SpanDataBase) -> None:
+    root = SpanDbRow(uid=_uid(), name="root", data_json="{}", parent_uid=None)
+    child = SpanDbRow(uid=_uid(), name="child", data_json="{}", parent_uid=root.uid)
+    leaf_1 = SpanDbRow(uid=_uid(), name="leaf", data_json="{}", parent_uid=child.uid)
+    leaf_2 = SpanDbRow(uid=_uid(), name="leaf", data_json="{}", parent_uid=root.uid)
+    other_root = SpanDbRow(uid=_uid(), name="other", data_json="{}", parent_uid=None)
+    tmp_db.insert_or_update_many([root, child, leaf_1, leaf_2, other_root])
+    assert Counter(tmp_db.get_leaf_uids(root_uid=root.uid)) == Counter(
+        [leaf_1.uid, leaf_2.uid]
+    )
+    assert tmp_db.get_leaf_uids(root_uid=leaf_1.uid) == [leaf_1.uid]
+    assert tmp_db.get_span_name_exists(root_uid=root.uid, name="child")
+    assert tmp_db.get_span_name_exists(root_uid=root.uid, name="root")
+    assert not tmp_db.get_span_name_exists(root_uid=root.uid, name="other")
+    assert not tmp_db.get_span_name_exists(root_uid=child.uid, name="root")
+
+
 def test_update_data(tmp_db: SpanDataBase) -> None:
     data_1 = dict(name="data_1", a_specific=1, common=dict(a=1, b=2))
     data_2 = dict(name="data_2", b_specific=22, common=dict(b=20, c=30))
     span = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="span",
-        data_json=json.dumps(data_1),
+        data_json=_dumps(data_1),
         parent_uid=None,
     )
-    tmp_db.insert_or_update(**span.model_dump())
-    tmp_db.update_data_json(uid=span.uid, data_json=json.dumps(data_2))
+    tmp_db.insert_or_update(*span.as_tuple())
+    tmp_db.update_data_json(uid=span.uid, data_json=_dumps(data_2))
     # Checks
     data_json_merged = tmp_db.get_data_json(uid=span.uid)
     data_merged = json.loads(data_json_merged)
@@ -142,72 +290,124 @@ def test_update_data(tmp_db: SpanDataBase) -> None:
     assert data_merged["common"] == dict(a=1, b=20, c=30)
 
 
+def test_buffered_writes(tmp_db: SpanDataBase) -> None:
+    span = SpanDbRow(
+        uid=_uid(),
+        name="span",
+        data_json=_dumps(dict(a=1, b=2)),
+        parent_uid=None,
+    )
+    tmp_db.buffer_insert(*span.as_tuple())
+    tmp_db.buffer_update_data_json(uid=span.uid, data_json=_dumps(dict(b=3)))
+    # Buffered writes are not in the database until flushed
+    with sqlite3.connect(tmp_db._database, uri=True) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM trace_spans;").fetchone() == (0,)
+    tmp_db.flush()
+    with sqlite3.connect(tmp_db._database, uri=True) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM trace_spans;").fetchone() == (1,)
+    assert json.loads(tmp_db.get_data_json(uid=span.uid)) == dict(a=1, b=3)
+
+
+def test_buffered_writes_flushed_on_read(tmp_db: SpanDataBase) -> None:
+    span = SpanDbRow(
+        uid=_uid(),
+        name="span",
+        data_json="{}",
+        parent_uid=None,
+    )
+    tmp_db.buffer_insert(*span.as_tuple())
+    assert tmp_db.get_span(uid=span.uid) == span
+
+
 def test_get_span_ids_from_name(tmp_db: SpanDataBase) -> None:
     span_1 = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="span",
         data_json="{}",
         parent_uid=None,
     )
     span_2 = SpanDbRow(
-        uid=new_uid(),
+        uid=_uid(),
         name="span",
         data_json="{}",
         parent_uid=None,
     )
     span_other = SpanDbRow(
-        uid=uuid.uuid4().bytes,
+        uid=_uid(),
         name="span_other",
         data_json="{}",
         parent_uid=None,
     )
-    tmp_db.insert_or_update(**span_1.model_dump())
+    tmp_db.insert_or_update(*span_1.as_tuple())
     assert tmp_db.get_span_ids_from_name(name="span") == [span_1.uid]
-    tmp_db.insert_or_update(**span_other.model_dump())
+    tmp_db.insert_or_update(*span_other.as_tuple())
     assert tmp_db.get_span_ids_from_name(name="span") == [span_1.uid]
-    tmp_db.insert_or_update(**span_2.model_dump())
-    assert set(tmp_db.get_span_ids_from_name(name="span")) == set(
+    tmp_db.insert_or_update(*span_2.as_tuple())
+    assert Counter(tmp_db.get_span_ids_from_name(name="span")) == Counter(
         [span_1.uid, span_2.uid]
     )
 
 
 def test_get_last_span_uid(tmp_db: SpanDataBase) -> None:
-    for i in range(5):
-        span = SpanDbRow(
-            uid=new_uid(),
+    assert tmp_db.get_last_span_uid() is None
+    spans = [
+        SpanDbRow(
+            uid=_uid(),
             name=f"span_{i}",
             data_json="{}",
             parent_uid=None,
         )
-        tmp_db.insert_or_update(**span.model_dump())
-        assert tmp_db.get_last_span_uid() == span.uid
+        for i in range(5)
+    ]
+    tmp_db.insert_or_update_many(spans)
+    assert tmp_db.get_last_span_uid() == spans[-1].uid
+
+
+def test_transaction_rollback(tmp_db: SpanDataBase) -> None:
+    span = SpanDbRow(
+        uid=_uid(),
+        name="test",
+        data_json="{}",
+        parent_uid=None,
+    )
+    with pytest.raises(RuntimeError):
+        with tmp_db.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO trace_spans (uid, parent_uid, name, data_json) "
+                "VALUES (?, ?, ?, ?);",
+                (span.uid, span.parent_uid, span.name, span.data_json),
+            )
+            raise RuntimeError("Abort transaction")
+    assert tmp_db.get_root_uids() == []
 
 
-def test_get_last_updated_span_uid(tmp_db: SpanDataBase) -> None:
+def test_get_last_updated_span_uid(
+    tmp_db: SpanDataBase, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Strictly increasing clock, so no need to wait between updates
+    monkeypatch.setattr(tmp_db, "_now", itertools.count(1).__next__)
     uids = []
     time_prev: float = 0.0
     # Test new
     for i in range(5):
         span = SpanDbRow(
-            uid=new_uid(),
+            uid=_uid(),
             name=f"span_{i}",
             data_json="{}",
             parent_uid=None,
         )
         uids.append(span.uid)
-        tmp_db.insert_or_update(**span.model_dump())
+        tmp_db.insert_or_update(*span.as_tuple())
         uid_updated_last, time_updated_last = tmp_db.get_last_updated_span_uid()
         assert uid_updated_last == span.uid
         assert time_updated_last is not None
         assert time_updated_last > time_prev
         time_prev = time_updated_last
-        time.sleep(0.001)
     # Test update data_json
     for i in reversed(range(5)):
-        tmp_db.update_data_json(uid=uids[i], data_json=json.dumps(dict(test=i)))
+        tmp_db.update_data_json(uid=uids[i], data_json=_dumps(dict(test=i)))
         uid_updated_last, time_updated_last = tmp_db.get_last_updated_span_uid()
         assert uid_updated_last == uids[i]
         assert time_updated_last is not None
         assert time_updated_last > time_prev
         time_prev = time_updated_last
-        time.sleep(0.001)
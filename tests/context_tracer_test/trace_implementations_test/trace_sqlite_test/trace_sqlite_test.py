@@ -1,22 +1,14 @@
-import tempfile
-from collections.abc import Iterator
 from pathlib import Path
 
-import pytest
-from context_tracer.trace import get_current_span_safe, log_with_trace, trace
+from context_tracer.trace import get_current_span_safe, trace
 from context_tracer.trace_implementations.trace_sqlite import (
     TraceSpanSqlite,
     TraceTreeSqlite,
     TracingSqlite,
 )
+from context_tracer.trace_implementations.trace_sqlite.span_db import SpanDataBase
 from context_tracer.trace_types import TraceSpan, TraceTree, Tracing
-
-
-@pytest.fixture
-def tmp_db_path() -> Iterator[Path]:
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        db_path = Path(tmp_dir) / "trace.db"
-        yield db_path
+from context_tracer_test._sample_program import do_c as program_entry
 
 
 def test_trace_sqlite(tmp_db_path: Path) -> None:
@@ -33,69 +25,57 @@ def test_trace_sqlite(tmp_db_path: Path) -> None:
 
 def test_trace_sqlite_initial(tmp_db_path: Path) -> None:
     tracing = TracingSqlite(db_path=tmp_db_path)
-    assert len(tracing.span_db.get_root_uids()) == 1
+    assert tracing.span_db.get_root_span_count() == 1
 
 
-def test_trace_sqlite_program(tmp_db_path: Path) -> None:
-    def program():
-        @trace
-        def do_a():
-            log_with_trace(name="A", test_var="Hello World From A!")
+def test_running_span_visible_to_other_reader(tmp_db_path: Path) -> None:
+    @trace(name="running")
+    def check_visible() -> None:
+        span = get_current_span_safe()
+        # Separate database object, like the viewer reading the trace while it runs
+        reader = SpanDataBase(db_path=tmp_db_path)
+        try:
+            assert reader.get_root_span_count() == 1
+            assert reader.get_name(uid=span.uid) == "running"
+            assert reader.get_last_updated_span_uid()[0] is not None
+        finally:
+            reader.close()
 
-        @trace
-        def do_d():
-            log_with_trace(name="D", test_var="Hello World From D!")
+    with TracingSqlite(db_path=tmp_db_path):
+        check_visible()
 
-        @trace
-        def do_e():
-            log_with_trace(name="E", test_var="Hello World From E!")
 
-        @trace
-        def do_b():
-            do_a()
-            do_d()
+def test_tree_sees_new_children(tmp_db_path: Path) -> None:
+    @trace(name="child")
+    def child() -> None:
+        pass
 
-        @trace(name="C")
-        def do_c():
-            do_b()
-            do_b()
-            do_e()
+    with TracingSqlite(db_path=tmp_db_path) as tracing:
+        tree_root = tracing.tree
+        assert tree_root.children == []
+        child()
+        # Children are read from the database on each access
+        assert [node.name for node in tree_root.children] == ["child"]
 
-        do_c()
 
+def test_trace_sqlite_program(tmp_db_path: Path) -> None:
     with TracingSqlite(db_path=tmp_db_path) as tracing:
-        program()
+        program_entry()
     assert tmp_db_path.exists()
-    assert len(tracing.span_db.get_root_uids()) == 1
-    assert tracing.span_db.get_root_uids()[0] == tracing.root_span.uid
+    assert tracing.span_db.get_root_uids() == [tracing.root_span.uid]
     tree_root = tracing.tree
     assert isinstance(tree_root, TraceTree)
     assert isinstance(tree_root, TraceTreeSqlite)
     assert tree_root.name == "root"
     assert len(tree_root.children) == 1
 
-    def get_leafs(tree_root: TraceTreeSqlite) -> list[TraceTreeSqlite]:
-        if len(tree_root.children) == 0:
-            return [tree_root]
-        leafs = []
-        for child in tree_root.children:
-            leafs.extend(get_leafs(child))
-        return leafs
-
-    leafs = get_leafs(tree_root)
-    assert len(leafs) == 5
-    for leaf in leafs:
-        assert leaf.name in {"A", "D", "E"}
-
-    def found_c(tree_root: TraceTreeSqlite) -> bool:
-        if tree_root.name == "C":
-            return True
-        for child in tree_root.children:
-            if found_c(child):
-                return True
-        return False
-
-    assert found_c(tree_root)
+    span_db = tracing.span_db
+    leaf_uids = span_db.get_leaf_uids(root_uid=tree_root.uid)
+    assert len(leaf_uids) == 5
+    for leaf_uid in leaf_uids:
+        assert span_db.get_name(uid=leaf_uid) in {"A", "D", "E"}
+
+    assert span_db.get_span_name_exists(root_uid=tree_root.uid, name="C")
 
 
 def test_update_data(tmp_db_path: Path) -> None:
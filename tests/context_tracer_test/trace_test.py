@@ -11,6 +11,8 @@ from context_tracer.constants import (
     FUNCTION_KWARGS_KEY,
     FUNCTION_NAME_KEY,
     FUNCTION_RETURNED_KEY,
+    START_TIME_KEY,
+    TRACE_METADATA_KEY,
 )
 from context_tracer.trace import trace
 from context_tracer.trace_implementations.trace_basic import (
@@ -47,6 +49,16 @@ def test_trace_context_manager_no_tracing() -> None:
     assert get_current_span() is None
 
 
+def test_trace_function_decorator_no_tracing() -> None:
+    @trace
+    def abcsum(a: int, b: int, c: int = 1) -> int:
+        assert get_current_span() is None
+        return a + b + c
+
+    # Without tracing the decorated function is called as is
+    assert abcsum(4, 3, c=2) == 9
+
+
 def test_get_current_span_no_trace() -> None:
     assert get_current_span() is None
 
@@ -183,3 +195,23 @@ def test_trace_function_decorator_exception() -> None:
     assert span.data[EXCEPTION_KEY][EXCEPTION_TYPE_KEY] == MyException.__name__
     assert span.data[EXCEPTION_KEY][EXCEPTION_MESSAGE_KEY] == exception_value
     assert span.data[EXCEPTION_KEY][EXCEPTION_STACKTRACE_KEY]
+
+
+def test_trace_function_decorator_data_not_shared() -> None:
+    spans_from_mock = []
+
+    @trace(test_var="test")
+    def mock_program() -> None:
+        spans_from_mock.append(get_current_span_safe_typed(TraceSpanInMemory))
+
+    with TracingInMemory():
+        mock_program()
+        mock_program()
+
+    # Each call gets its own span data, the decorator's data isn't modified
+    span_1, span_2 = spans_from_mock
+    assert span_1.data is not span_2.data
+    assert span_1.data[TRACE_METADATA_KEY] is not span_2.data[TRACE_METADATA_KEY]
+    assert span_1.data["test_var"] == span_2.data["test_var"] == "test"
+    assert START_TIME_KEY in span_1.data[TRACE_METADATA_KEY]
+    assert START_TIME_KEY in span_2.data[TRACE_METADATA_KEY]
@@ -1,4 +1,6 @@
+import dataclasses
 import logging
+from typing import Any
 
 import pytest
 from context_tracer.trace_implementations.trace_basic import (
@@ -8,11 +10,14 @@ from context_tracer.trace_implementations.trace_basic import (
 from context_tracer.trace_types import (
     TraceError,
     TraceSpan,
+    TraceTree,
     Tracing,
+    find_by_name,
     get_current_span,
     get_current_span_safe,
     get_current_span_safe_typed,
     trace_span_context,
+    walk_leaves,
 )
 
 logger = logging.getLogger(__name__)
@@ -61,3 +66,22 @@ def test_get_current_span() -> None:
         get_current_span_safe()
     with pytest.raises(TraceError):
         get_current_span_safe_typed(TraceSpanInMemory)
+
+
+# Test Trace Tree ##################################################
+@dataclasses.dataclass
+class _Node:
+    """Tree that only implements the `TraceTree` protocol structurally."""
+
+    name: str
+    children: list["_Node"] = dataclasses.field(default_factory=list)
+    data: dict[str, Any] = dataclasses.field(default_factory=dict)
+
+
+def test_walk_tree() -> None:
+    tree = _Node("root", [_Node("a", [_Node("b")]), _Node("c")])
+    assert isinstance(tree, TraceTree)
+    assert sorted(node.name for node in walk_leaves(tree)) == ["b", "c"]
+    found = find_by_name(tree, "b")
+    assert found is not None and found.name == "b"
+    assert find_by_name(tree, "not-a-node") is None
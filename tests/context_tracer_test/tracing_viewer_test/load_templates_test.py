@@ -0,0 +1,16 @@
+from context_tracer.tracing_viewer.load_templates import (
+    get_flamechart_template,
+    get_flamechart_view,
+)
+
+
+def test_get_flamechart_view_inline_data() -> None:
+    data_dict = {"name": "root", "data": {"msg": "<b>Hello</b>"}, "children": []}
+    html_text = get_flamechart_view(data_dict=data_dict)
+    # Data is inlined as compact, html escaped json
+    assert '{"name":"root","data":{"msg":"&lt;b&gt;Hello&lt;/b&gt;"}' in html_text
+    assert "<b>Hello</b>" not in html_text
+
+
+def test_get_flamechart_template_cached() -> None:
+    assert get_flamechart_template() is get_flamechart_template()
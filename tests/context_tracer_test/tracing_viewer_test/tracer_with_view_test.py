@@ -1,26 +1,24 @@
 import logging
-import tempfile
 import uuid
 from pathlib import Path
-from typing import Iterator
 
 import pytest
 import requests
 from bs4 import BeautifulSoup
-from context_tracer.trace import log_with_trace, trace
 from context_tracer.trace_types import (
     TraceSpan,
     TraceTree,
     Tracing,
+    find_by_name,
+    walk_leaves,
 )
 from context_tracer.tracing_viewer.tracer_with_view import TracingWithViewer
+from context_tracer_test._sample_program import do_c as program_entry
 
 
 @pytest.fixture
-def tmp_html_export_path() -> Iterator[Path]:
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        html_path = Path(tmp_dir) / "test.html"
-        yield html_path
+def tmp_html_export_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return tmp_path_factory.mktemp("html") / "test.html"
 
 
 def test_tracing_with_viewer(
@@ -48,39 +46,13 @@ def test_tracing_with_viewer(
 
 
 def test_trace_sqlite_program(tmp_db_path: Path, tmp_html_export_path: Path) -> None:
-    def program():
-        @trace
-        def do_a():
-            log_with_trace(name="A", test_var="Hello World From A!")
-
-        @trace
-        def do_d():
-            log_with_trace(name="D", test_var="Hello World From D!")
-
-        @trace
-        def do_e():
-            log_with_trace(name="E", test_var="Hello World From E!")
-
-        @trace
-        def do_b():
-            do_a()
-            do_d()
-
-        @trace(name="C")
-        def do_c():
-            do_b()
-            do_b()
-            do_e()
-
-        do_c()
-
     root_name = f"root-{uuid.uuid4()}"
     with TracingWithViewer(
         db_path=tmp_db_path,
         name=root_name,
         export_html_path=tmp_html_export_path,
     ) as tracing:
-        program()
+        program_entry()
     # Checks
     assert tmp_db_path.exists()
     # Check actual tree
@@ -89,28 +61,12 @@ def test_trace_sqlite_program(tmp_db_path: Path, tmp_html_export_path: Path) ->
     assert tree_root.name == root_name
     assert len(tree_root.children) == 1
 
-    def get_leafs(tree_root: TraceTree) -> list[TraceTree]:
-        if len(tree_root.children) == 0:
-            return [tree_root]
-        leafs = []
-        for child in tree_root.children:
-            leafs.extend(get_leafs(child))
-        return leafs
-
-    leafs = get_leafs(tree_root)
+    leafs = list(walk_leaves(tree_root))
     assert len(leafs) == 5
     for leaf in leafs:
         assert leaf.name in {"A", "D", "E"}
 
-    def found_c(tree_root: TraceTree) -> bool:
-        if tree_root.name == "C":
-            return True
-        for child in tree_root.children:
-            if found_c(child):
-                return True
-        return False
-
-    assert found_c(tree_root)
+    assert find_by_name(tree_root, "C") is not None
     # Check view
     assert tmp_html_export_path.exists()
     html_text = tmp_html_export_path.read_text()
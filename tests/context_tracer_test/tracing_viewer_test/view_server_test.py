@@ -0,0 +1,34 @@
+import sys
+
+from context_tracer.trace_implementations.trace_basic import TraceSpanInMemory
+from context_tracer.tracing_viewer.view_server import trace_tree_to_dict
+
+
+def test_trace_tree_to_dict() -> None:
+    root = TraceSpanInMemory(name="root", parent=None, data={"a": 1})
+    child_1 = root.new_child(name="child_1", b=2)
+    root.new_child(name="child_2")
+    child_1.new_child(name="grandchild")
+    assert trace_tree_to_dict(root) == {
+        "name": "root",
+        "data": {"a": 1},
+        "children": [
+            {
+                "name": "child_1",
+                "data": {"b": 2},
+                "children": [{"name": "grandchild", "data": {}, "children": []}],
+            },
+            {"name": "child_2", "data": {}, "children": []},
+        ],
+    }
+
+
+def test_trace_tree_to_dict_deep() -> None:
+    depth = sys.getrecursionlimit() + 10
+    root = node = TraceSpanInMemory(name="root", parent=None)
+    for _ in range(depth):
+        node = node.new_child(name="child")
+    tree_dict = trace_tree_to_dict(root)
+    for _ in range(depth):
+        (tree_dict,) = tree_dict["children"]
+    assert tree_dict == {"name": "child", "data": {}, "children": []}
@@ -1,10 +1,14 @@
+import asyncio
 import contextlib
 import functools
 import logging
 import multiprocessing as mp
+import socket
+import sys
 from contextlib import asynccontextmanager
 from http import HTTPStatus
 from multiprocessing import Queue
+from multiprocessing.synchronize import Event as EventType
 from typing import Iterator
 
 import pytest
@@ -20,11 +24,31 @@ from fastapi.responses import Response
 log = logging.getLogger(__name__)
 
 
+# `forkserver` imports the preloaded modules once and forks every server from that.
+# Keep `spawn` where it is the platform default.
+MP_START_METHODS = [
+    start_method
+    for start_method in (
+        ["fork", "forkserver"] if sys.platform == "linux" else ["spawn", "forkserver"]
+    )
+    if start_method in mp.get_all_start_methods()
+]
+FORKSERVER_PRELOAD = ["fastapi", "uvicorn", "context_tracer.utils.fast_api_utils"]
+
+
+@pytest.fixture(scope="module")
+def http() -> Iterator[requests.Session]:
+    with requests.Session() as session:
+        yield session
+
+
 @contextlib.contextmanager
 def multiprocess_start_method(start_method: str) -> Iterator[None]:
     log.info(f"multiprocess_start_method(start_method={start_method})")
     prev_start_method = mp.get_start_method()
     mp.set_start_method(start_method, force=True)
+    if start_method == "forkserver":
+        mp.set_forkserver_preload(FORKSERVER_PRELOAD)
     try:
         yield
     finally:
@@ -43,6 +67,18 @@ def create_simple_app(queue: Queue, host: str, port: int) -> FastAPI:
     return app
 
 
+def create_blocked_app(release_startup: EventType, **kwargs) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Block startup (before uvicorn accepts connections) until released
+        await asyncio.to_thread(release_startup.wait, 30)
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+    app.add_api_route(READINESS_ENDPOINT_PATH, readiness_api, methods=["GET"])
+    return app
+
+
 def create_lifespan_app(queue: Queue, **kwargs) -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
@@ -58,14 +94,14 @@ def create_lifespan_app(queue: Queue, **kwargs) -> FastAPI:
 
 @pytest.mark.parametrize(
     "mp_start_method",
-    ["fork", "spawn"],
+    MP_START_METHODS,
 )
-def test_trace_server(mp_start_method: str) -> None:
+def test_trace_server(mp_start_method: str, http: requests.Session) -> None:
     with multiprocess_start_method(mp_start_method):
         proc = None
         ctx = mp.get_context()
         assert ctx.get_start_method() == mp_start_method
-        queue = ctx.Manager().Queue()
+        queue = ctx.Queue()
         create_app = functools.partial(create_simple_app, queue=queue)
         with FastAPIProcessRunner(create_app=create_app) as server:
             proc = server._proc
@@ -75,33 +111,54 @@ def test_trace_server(mp_start_method: str) -> None:
             assert server._proc.is_alive()
             assert server.url is not None
             liveness_url = f"{server.url}{READINESS_ENDPOINT_PATH}"
-            resp = requests.get(liveness_url)
+            resp = http.get(liveness_url)
             assert resp.status_code == 200
             assert resp.text == "ok"
-            assert queue.get() == (server.host, server.port)
+            assert queue.get(timeout=30) == (server.host, server.port)
         # Server should be stopped
         assert not proc.is_alive()
         assert server._proc is None
         assert server._socket is None
         with pytest.raises(requests.exceptions.ConnectionError):
-            requests.get(liveness_url)
+            http.get(liveness_url)
 
 
 @pytest.mark.parametrize(
     "mp_start_method",
-    ["fork", "spawn"],
+    MP_START_METHODS,
 )
 def test_trace_server_lifespan(
     mp_start_method: str,
+    http: requests.Session,
 ) -> None:
     with multiprocess_start_method(mp_start_method):
         ctx = mp.get_context()
         assert ctx.get_start_method() == mp_start_method
-        queue = ctx.Manager().Queue()
+        queue = ctx.Queue()
         create_app = functools.partial(create_lifespan_app, queue=queue)
         with FastAPIProcessRunner(create_app=create_app) as server:
-            assert queue.get() == "on-start"
-            resp = requests.get(f"{server.url}{READINESS_ENDPOINT_PATH}")
+            assert queue.get(timeout=30) == "on-start"
+            server.wait_for_ready(timeout_sec=5)
+            assert server.is_ready()
+            resp = http.get(f"{server.url}{READINESS_ENDPOINT_PATH}")
             assert resp.status_code == 200
             assert resp.text == "ok"
-        assert queue.get() == "on-shutdown"
+        assert queue.get(timeout=30) == "on-shutdown"
+
+
+def test_connections_queued_before_startup(http: requests.Session) -> None:
+    ctx = mp.get_context()
+    release_startup = ctx.Event()
+    create_app = functools.partial(create_blocked_app, release_startup=release_startup)
+    with FastAPIProcessRunner(create_app=create_app) as server:
+        # Uvicorn isn't accepting yet, connections wait in the listening socket's backlog
+        connections = [
+            socket.create_connection((server.host, server.port), timeout=5)
+            for _ in range(16)
+        ]
+        for connection in connections:
+            connection.close()
+        release_startup.set()
+        server.wait_for_ready(timeout_sec=30)
+        resp = http.get(f"{server.url}{READINESS_ENDPOINT_PATH}")
+        assert resp.status_code == 200
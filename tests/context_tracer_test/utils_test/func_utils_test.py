@@ -0,0 +1,27 @@
+from context_tracer.utils.func_utils import (
+    POSITIONAL_ARGS_KEY,
+    bind_func_args,
+    get_func_bound_args,
+    get_func_signature,
+)
+
+
+def abcsum(a: int, b: int, c: int = 1) -> int:
+    return a + b + c
+
+
+def test_get_func_bound_args() -> None:
+    assert get_func_bound_args(abcsum, 4, 3, c=2) == {"a": 4, "b": 3, "c": 2}
+    # Defaults are applied
+    assert get_func_bound_args(abcsum, 4, b=3) == {"a": 4, "b": 3, "c": 1}
+
+
+def test_bind_func_args_no_signature() -> None:
+    # Builtins like `max` don't expose a signature
+    sig = get_func_signature(max)
+    assert sig is None
+    assert bind_func_args(sig, 1, 2, key=abs) == {
+        POSITIONAL_ARGS_KEY: (1, 2),
+        "key": abs,
+    }
+    assert bind_func_args(sig, key=abs) == {"key": abs}
@@ -1,5 +1,7 @@
 import uuid
 
+import pytest
+
 from context_tracer.utils.id_utils import new_uid, uid_to_bytes, uid_to_str
 
 
@@ -11,14 +13,15 @@ def test_new_id_sequential() -> None:
         id_prev = id_next
 
 
-def test_span_payload_id_conversion() -> None:
-    for uid_bytes in [
+@pytest.mark.parametrize(
+    "uid_bytes",
+    [
         new_uid(),
         uuid.uuid1().bytes,
         uuid.uuid4().bytes,
-        new_uid(),
-        uuid.uuid4().bytes,
-        uuid.uuid4().bytes,
-        new_uid(),
-    ]:
-        assert uid_to_bytes(uid_to_str(uid_bytes)) == uid_bytes
+        uuid.uuid5(uuid.uuid1(), "test").bytes,
+    ],
+    ids=["new_uid", "uuid1", "uuid4", "uuid5"],
+)
+def test_span_payload_id_conversion(uid_bytes: bytes) -> None:
+    assert uid_to_bytes(uid_to_str(uid_bytes)) == uid_bytes
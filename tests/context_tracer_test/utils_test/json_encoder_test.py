@@ -0,0 +1,102 @@
+import collections
+import dataclasses
+import datetime
+import enum
+import json
+import math
+import sys
+import uuid
+
+import pytest
+from context_tracer.utils.json_encoder import CustomEncoder, dumps, loads
+
+
+def test_loads() -> None:
+    data = {"a": 1, "b": [1.5, "c", None, True], "d": {"e": "f"}}
+    data_json = json.dumps(data, cls=CustomEncoder)
+    assert loads(data_json) == data
+    assert loads(data_json.encode()) == data
+
+
+def test_loads_nan() -> None:
+    # The standard library encoder writes `NaN`, which isn't strict JSON
+    data_json = json.dumps({"a": float("nan")}, cls=CustomEncoder)
+    assert math.isnan(loads(data_json)["a"])
+
+
+def test_dumps_traceback() -> None:
+    try:
+        raise ValueError("test")
+    except ValueError:
+        traceback = sys.exc_info()[2]
+    data_json = json.dumps({"tb": traceback}, cls=CustomEncoder)
+    traceback_str = loads(data_json)["tb"]
+    assert "test_dumps_traceback" in traceback_str
+    assert 'raise ValueError("test")' in traceback_str
+
+
+def test_dumps() -> None:
+    date = datetime.datetime(2023, 1, 2, 3, 4, 5)
+    data = {"a": 1, "b": [1.5, "c", None, True], 3: date}
+    data_json = dumps(data)
+    assert " " not in data_json.replace("2023-01-02 03:04:05", "")
+    assert loads(data_json) == {
+        "a": 1,
+        "b": [1.5, "c", None, True],
+        "3": "2023-01-02 03:04:05",
+    }
+
+
+class _Color(enum.Enum):
+    RED = 1
+    BLUE = (0, 0, 255)
+
+
+class _Size(enum.IntEnum):
+    SMALL = 1
+
+
+class _Name(str):
+    pass
+
+
+class _Count(int):
+    pass
+
+
+class _Mapping(dict):
+    pass
+
+
+_Point = collections.namedtuple("_Point", ["x", "y"])
+
+
+@dataclasses.dataclass
+class _Data:
+    a: int
+    b: list[str]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        _Color.RED,
+        _Color.BLUE,
+        _Size.SMALL,
+        _Name("name"),
+        _Count(3),
+        _Mapping(a=1, b=_Point(1, 2)),
+        _Point(1, 2),
+        _Data(a=1, b=["c"]),
+        uuid.UUID(int=5),
+        datetime.datetime(2023, 1, 2, 3, 4, 5),
+        datetime.timedelta(seconds=3),
+        {1: "int key", "set": {1}},
+        b"bytes",
+        2**70,
+    ],
+)
+def test_dumps_same_as_custom_encoder(value: object) -> None:
+    # `dumps` (with or without `orjson`) matches the standard library encoder
+    data = {"value": value, "nested": [value]}
+    assert dumps(data) == json.dumps(data, cls=CustomEncoder, separators=(",", ":"))
@@ -0,0 +1,10 @@
+from datetime import timedelta
+
+from context_tracer.utils.time_utils import get_local_timestamp, get_utc_timestamp
+
+
+def test_get_local_timestamp() -> None:
+    local_timestamp = get_local_timestamp()
+    assert local_timestamp.tzinfo is not None
+    # Same instant as UTC, only expressed in the local offset
+    assert abs(get_utc_timestamp() - local_timestamp) < timedelta(seconds=1)
@@ -1,5 +1,9 @@
+import itertools
+from functools import reduce
+
 from context_tracer.utils.url_utils import (
     create_query_url,
+    join_slash,
     parse_url_query_safe,
     urljoin_forward_slash,
 )
@@ -24,6 +28,13 @@ def test_urljoin_simple() -> None:
     )
 
 
+def test_urljoin_matches_pairwise_join() -> None:
+    fragments = ["", "/", "//", "a", "/a", "a/", "/a/", "a//b"]
+    for n_args in range(1, 5):
+        for args in itertools.product(fragments, repeat=n_args):
+            assert urljoin_forward_slash(*args) == reduce(join_slash, args), args
+
+
 def test_parse_url_query_safe() -> None:
     dct = parse_url_query_safe("http://www.example.com/?one=1&two=2")
     assert dct["one"] == "1"
@@ -97,3 +108,11 @@ def test_create_query_url() -> None:
         query_url
         == "http://www.example.com/?repeated=1&repeated=2&repeated=3&space=jams&space=slams"
     )
+
+
+def test_create_query_url_many_params() -> None:
+    params = {f"key {i}": f"value {i}" for i in range(1000)}
+    query_url = create_query_url(url="http://www.example.com/", params=params)
+    assert query_url.startswith("http://www.example.com/?key%200=value%200&")
+    assert "+" not in query_url
+    assert parse_url_query_safe(query_url) == params
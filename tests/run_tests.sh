@@ -6,9 +6,17 @@ set -e  # Exit if anything fails
 TEST_DIR=$(dirname "$(readlink -f "$0")")  # Test directory path
 cd "${TEST_DIR}"
 
+# Spread tests over pytest-xdist workers if it is installed
+# `loadgroup` keeps each `xdist_group` on one worker
+XDIST_ARGS=()
+if python -c "import xdist" 2> /dev/null; then
+    XDIST_ARGS=(-n auto --dist loadgroup)
+fi
+
 # Run tests
 echo "Run Pytest for '${TEST_DIR}'"
 pytest \
+    "${XDIST_ARGS[@]}" \
     --failed-first \
     -m 'not notebook_test' \
     -o log_cli=false \